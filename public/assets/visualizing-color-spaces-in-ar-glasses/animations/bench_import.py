@@ -0,0 +1,73 @@
+"""Import-time benchmark for the color modules.
+
+Each NumPy-only module in this directory (every module that does not
+import manim, benchmarks and tests aside) is imported in a fresh
+interpreter, several times, and the best wall-clock time is reported
+alongside bare ``import numpy`` (the floor for all of them) and ``import
+manim`` when it is installed.
+
+    python bench_import.py --repeat 7 --json import_times.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Scenes and mobjects; they pay for the manim import
+MANIM_IMPORT = re.compile(r"^\s*(?:from|import)\s+manim\b", re.MULTILINE)
+
+
+def numpy_only_modules(directory=HERE):
+    """Sorted names of the modules in ``directory`` that never import manim."""
+    modules = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext != ".py" or stem.startswith(("bench_", "test_")):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            if not MANIM_IMPORT.search(f.read()):
+                modules.append(stem)
+    return modules
+
+
+MODULES = ("numpy", *numpy_only_modules())
+
+
+def import_time(module, repeat=5):
+    """Best-of-``repeat`` seconds to start Python and import ``module``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=HERE, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(modules=MODULES, repeat=5):
+    results = {"python": import_time("sys", repeat)}
+    for module in modules:
+        results[module] = import_time(module, repeat)
+    if importlib.util.find_spec("manim") is not None:
+        results["manim"] = import_time("manim", repeat)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time of the color modules.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(repeat=args.repeat)
+    interpreter = results["python"]
+    for module, seconds in results.items():
+        print(f"{module:>18}  {seconds * 1000:8.1f} ms  (+{(seconds - interpreter) * 1000:.1f} ms over bare python)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
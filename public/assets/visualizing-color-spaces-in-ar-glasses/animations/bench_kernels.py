@@ -0,0 +1,222 @@
+"""Throughput and peak-memory benchmark of the color kernels.
+
+Sweeps every kernel over input sizes (1e3 to 1e8 pixels by default) and
+dtypes, and records Mpixel/s (best of several timed runs) and the peak
+``tracemalloc`` memory of one extra traced run. NumPy reports its buffers to
+tracemalloc, so the peak covers the output and every temporary but not the
+input, which is allocated before tracing starts.
+
+Sizes whose estimated working set exceeds ``--max-bytes`` are streamed
+through one buffer that fits, in chunks, so the default sweep reaches 1e8
+pixels in a 2 GiB budget; their throughput covers all pixels and their
+peak is that of a chunk. Chunked and skipped sizes are listed at the end of
+the output. Both the component-first converters the scenes use and their
+batched counterparts are measured:
+
+    python bench_kernels.py --json baseline.json
+    python bench_kernels.py --sizes 1e5 1e6 --compare baseline.json --threshold 0.1
+
+``--compare`` flags any (kernel, dtype, size) whose throughput fell, or
+whose peak memory grew, by more than ``--threshold`` against the baseline,
+and exits with status 1 when there is a regression.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import color_kernels as ck
+from bench_spaces import best_time
+
+SIZES = tuple(10 ** e for e in range(3, 9))
+DTYPES = ("float32", "float64")
+
+# Space timed by the two transform_rgb_to_space kernels
+SPACE = "CIELAB"
+
+# Working set per input element assumed when sizing the buffer a run streams
+# through; larger sizes run in chunks of at most MAX_BYTES
+WORKING_SET_FACTOR = 6
+MAX_BYTES = 2 << 30
+
+# Timed runs continue until this many seconds have been spent (at least 3 runs)
+MIN_TIME = 0.2
+
+
+def _component_first(func, *args):
+    """Kernel taking a (3, N) channels-first array."""
+    return lambda rgb, out: func(rgb.T, *args)
+
+
+def _batched(func, *args):
+    """Kernel taking an (N, 3) array and an output buffer."""
+    return lambda rgb, out: func(rgb, *args, out=out)
+
+
+KERNELS = {
+    "srgb_to_linear": _component_first(ck.srgb_to_linear),
+    "linear_to_xyz": _component_first(ck.linear_to_xyz),
+    "xyz_to_lab": _component_first(ck.xyz_to_lab),
+    "rgb_to_hsv": _component_first(ck.rgb_to_hsv),
+    "rgb_to_hsl": _component_first(ck.rgb_to_hsl),
+    "transform_rgb_to_space": _component_first(ck.transform_rgb_to_space, SPACE),
+    "rgb_to_lab": _component_first(ck.rgb_to_lab),
+    "srgb_to_linear_batch": _batched(ck.srgb_to_linear_batch),
+    "linear_to_xyz_batch": _batched(ck.linear_to_xyz_batch),
+    "xyz_to_lab_batch": _batched(ck.xyz_to_lab_batch),
+    "rgb_to_hsv_batch": _batched(ck.rgb_to_hsv_batch),
+    "rgb_to_hsl_batch": _batched(ck.rgb_to_hsl_batch),
+    "transform_rgb_to_space_batch": _batched(ck.transform_rgb_to_space_batch, SPACE),
+    "rgb_to_lab_batch": _batched(ck.rgb_to_lab_batch),
+    "rgb_to_oklab_batch": _batched(ck.rgb_to_oklab_batch),
+}
+
+
+# ============ Measurement ============
+
+def measure(kernel, rgb, out, size, min_time=MIN_TIME):
+    """Best seconds to convert ``size`` pixels and the traced peak bytes of one pass.
+
+    The pixels are fed through ``rgb`` / ``out`` in chunks when ``size`` is
+    larger than the buffers.
+    """
+    block = rgb.shape[0]
+
+    def call():
+        for start in range(0, size, block):
+            n = min(block, size - start)
+            kernel(rgb[:n], out[:n])
+
+    first = best_time(call, 1)
+    best = min(first, best_time(call, max(2, int(min_time / max(first, 1e-9)))))
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(kernels=tuple(KERNELS), sizes=SIZES, dtypes=DTYPES, max_bytes=MAX_BYTES, seed=0, log=None):
+    """{"meta": ..., "results": {kernel: {dtype: {size: entry}}}}.
+
+    An entry is ``{"mpix_s", "seconds", "peak_bytes"}``, plus ``"chunk"``
+    (pixels per chunk) when the size ran in chunks, or ``{"skipped"}`` when
+    not even one pixel fits ``max_bytes``.
+    """
+    rng = np.random.default_rng(seed)
+    results = {name: {dtype: {} for dtype in dtypes} for name in kernels}
+    for dtype in dtypes:
+        chunk = max_bytes // (3 * np.dtype(dtype).itemsize * WORKING_SET_FACTOR)
+        for size in sizes:
+            if chunk < 1:
+                for name in kernels:
+                    results[name][dtype][str(size)] = {"skipped": "over max_bytes"}
+                    if log:
+                        log(name, dtype, size, results[name][dtype][str(size)])
+                continue
+            rgb = rng.random((min(size, chunk), 3), dtype=np.dtype(dtype))
+            out = np.empty_like(rgb)
+            for name in kernels:
+                seconds, peak = measure(KERNELS[name], rgb, out, size)
+                entry = results[name][dtype][str(size)] = {
+                    "mpix_s": size / seconds / 1e6,
+                    "seconds": seconds,
+                    "peak_bytes": peak,
+                }
+                if size > chunk:
+                    entry["chunk"] = chunk
+                if log:
+                    log(name, dtype, size, entry)
+            del rgb, out
+    meta = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+    return {"meta": meta, "results": results}
+
+
+# ============ Comparison ============
+
+def compare(current, baseline, threshold=0.1):
+    """Regressions of ``current`` against ``baseline``.
+
+    Returns a list of (kernel, dtype, size, metric, baseline, current) for
+    throughput drops and peak-memory growth beyond ``threshold``.
+    """
+    regressions = []
+    for name, by_dtype in current["results"].items():
+        for dtype, by_size in by_dtype.items():
+            for size, entry in by_size.items():
+                base = baseline["results"].get(name, {}).get(dtype, {}).get(size)
+                if base is None or "skipped" in base or "skipped" in entry:
+                    continue
+                if entry["mpix_s"] < base["mpix_s"] * (1 - threshold):
+                    regressions.append((name, dtype, size, "mpix_s", base["mpix_s"], entry["mpix_s"]))
+                if entry["peak_bytes"] > base["peak_bytes"] * (1 + threshold):
+                    regressions.append((name, dtype, size, "peak_bytes", base["peak_bytes"], entry["peak_bytes"]))
+    return regressions
+
+
+def _print_entry(name, dtype, size, entry):
+    if "skipped" in entry:
+        print(f"{name:>28}  {dtype}  {size:>9}  skipped ({entry['skipped']})")
+        return
+    line = (f"{name:>28}  {dtype}  {size:>9}  {entry['mpix_s']:9.2f} Mpixel/s  "
+            f"peak {entry['peak_bytes'] / 2 ** 20:9.2f} MiB")
+    if "chunk" in entry:
+        line += f"  (chunks of {entry['chunk']})"
+    print(line)
+
+
+def _print_limits(report):
+    """One line per (dtype, size) that was chunked or skipped."""
+    seen = set()
+    for by_dtype in report["results"].values():
+        for dtype, by_size in by_dtype.items():
+            for size, entry in by_size.items():
+                if (dtype, size) in seen:
+                    continue
+                seen.add((dtype, size))
+                if "skipped" in entry:
+                    print(f"skipped {dtype} {size}: {entry['skipped']}")
+                elif "chunk" in entry:
+                    print(f"chunked {dtype} {size}: over max_bytes, ran in chunks of {entry['chunk']} pixels")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the color kernels' throughput and peak memory.")
+    parser.add_argument("--kernels", nargs="+", choices=list(KERNELS), default=list(KERNELS))
+    parser.add_argument("--sizes", type=lambda v: int(float(v)), nargs="+", default=list(SIZES),
+                        help="pixel counts, e.g. 1e3 1e6")
+    parser.add_argument("--dtypes", nargs="+", choices=DTYPES, default=list(DTYPES))
+    parser.add_argument("--max-bytes", type=lambda v: int(float(v)), default=MAX_BYTES,
+                        help="run sizes whose estimated working set is larger in chunks")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown / memory growth")
+    args = parser.parse_args()
+
+    report = run(args.kernels, args.sizes, args.dtypes, args.max_bytes, log=_print_entry)
+    _print_limits(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, dtype, size, metric, before, after in regressions:
+            print(f"REGRESSION {name} {dtype} {size}: {metric} {before:.4g} -> {after:.4g}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
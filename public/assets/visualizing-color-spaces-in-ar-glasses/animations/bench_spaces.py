@@ -0,0 +1,63 @@
+"""Throughput benchmark of every color space kernel.
+
+Times the native converter (CONVERTERS) and the display transform
+(transform_rgb_to_space_batch) of each space on one buffer of random sRGB
+pixels, in float32 and float64, and reports the best of ``--repeat`` runs
+in Mpixel/s. Useful for picking the cheapest perceptual space on device:
+
+    python bench_spaces.py --pixels 1000000 --json space_throughput.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from color_kernels import CONVERTERS, SPACES, transform_rgb_to_space_batch
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(pixels=1 << 20, repeat=5, dtypes=("float32", "float64"), seed=0):
+    """{space: {dtype: {"native": Mpixel/s, "display": Mpixel/s}}}."""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for space in SPACES:
+        results[space] = {}
+        for dtype in dtypes:
+            rgb = rng.random((pixels, 3)).astype(dtype)
+            out = np.empty_like(rgb)
+            entry = {}
+            if space in CONVERTERS:
+                seconds = best_time(lambda: CONVERTERS[space](rgb, out), repeat)
+                entry["native"] = pixels / seconds / 1e6
+            seconds = best_time(lambda: transform_rgb_to_space_batch(rgb, space, out), repeat)
+            entry["display"] = pixels / seconds / 1e6
+            results[space][dtype] = entry
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the throughput of every color space kernel.")
+    parser.add_argument("--pixels", type=int, default=1 << 20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.pixels, args.repeat)
+    print(f"{'':>10}  {'native f32':>10}  {'native f64':>10}  {'display f32':>11}  {'display f64':>11}  Mpixel/s")
+    for space, by_dtype in results.items():
+        native = [f"{by_dtype[d]['native']:10.1f}" if "native" in by_dtype[d] else f"{'-':>10}"
+                  for d in ("float32", "float64")]
+        display = [f"{by_dtype[d]['display']:11.1f}" for d in ("float32", "float64")]
+        print(f"{space:>10}  {native[0]}  {native[1]}  {display[0]}  {display[1]}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
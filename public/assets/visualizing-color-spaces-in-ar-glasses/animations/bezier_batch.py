@@ -0,0 +1,92 @@
+"""Cubic Bézier control points for many polylines at once.
+
+``VMobject.set_points_smoothly`` builds and solves a small linear system
+for every line. For M polylines of K points the system matrix is the same
+for all of them, so smooth_cubic_beziers solves it once for every line and
+coordinate together (one ``np.linalg.solve`` with 3M right-hand sides).
+The handles are those of manim's smooth mode (natural spline ends for open
+lines, periodic for closed ones), laid out like a manim CE VMobject's
+points, anchor / handle / handle / anchor per curve:
+
+    curves = smooth_cubic_beziers(polylines)   # (M, K, 3) -> (M, K-1, 4, 3)
+    vmobject.set_points(curves.reshape(-1, 3))  # all M lines as subpaths
+    line.set_points(curves[i].reshape(-1, 3))   # or line i on its own
+"""
+import numpy as np
+
+_system_cache = {}
+
+
+def _open_system(n):
+    """Tridiagonal system for the first handles of n open curves."""
+    key = ("open", n)
+    if key not in _system_cache:
+        system = np.diag(np.full(n, 4.0)) + np.diag(np.ones(n - 1), 1) + np.diag(np.ones(n - 1), -1)
+        system[0, 0] = 2.0
+        system[-1, -1] = 7.0
+        system[-1, -2] = 2.0
+        _system_cache[key] = system
+    return _system_cache[key]
+
+
+def _closed_system(n):
+    """Cyclic system for the first handles of n curves forming a loop."""
+    key = ("closed", n)
+    if key not in _system_cache:
+        system = 4.0 * np.eye(n) + np.roll(np.eye(n), 1, axis=1) + np.roll(np.eye(n), -1, axis=1)
+        _system_cache[key] = system
+    return _system_cache[key]
+
+
+def _solve(system, rhs):
+    """Solve ``system @ x = rhs`` for every (M, n, 3) line and coordinate."""
+    m, n, _ = rhs.shape
+    columns = rhs.transpose(1, 0, 2).reshape(n, -1)
+    return np.linalg.solve(system, columns).reshape(n, m, 3).transpose(1, 0, 2)
+
+
+def _open_handles(anchors):
+    n = anchors.shape[1] - 1
+    rhs = 4 * anchors[:, :-1] + 2 * anchors[:, 1:]
+    rhs[:, 0] = anchors[:, 0] + 2 * anchors[:, 1]
+    rhs[:, -1] = 8 * anchors[:, -2] + anchors[:, -1]
+    h1 = _solve(_open_system(n), rhs)
+    h2 = np.empty_like(h1)
+    h2[:, :-1] = 2 * anchors[:, 1:-1] - h1[:, 1:]
+    h2[:, -1] = (anchors[:, -1] + h1[:, -1]) / 2
+    return h1, h2
+
+
+def _closed_handles(anchors):
+    n = anchors.shape[1] - 1
+    rhs = 4 * anchors[:, :-1] + 2 * anchors[:, 1:]
+    h1 = _solve(_closed_system(n), rhs)
+    h2 = 2 * anchors[:, 1:] - np.roll(h1, -1, axis=1)
+    return h1, h2
+
+
+def corner_cubic_beziers(polylines):
+    """(M, K, 3) polylines -> (M, K-1, 4, 3) straight segments."""
+    polylines = np.asarray(polylines, dtype=np.float64)
+    a0, a1 = polylines[:, :-1], polylines[:, 1:]
+    return np.stack([a0, (2 * a0 + a1) / 3, (a0 + 2 * a1) / 3, a1], axis=2)
+
+
+def smooth_cubic_beziers(polylines):
+    """(M, K, 3) polylines -> (M, K-1, 4, 3) smooth curves through every point.
+
+    A line whose first and last points coincide is smoothed as a closed
+    loop, as manim does.
+    """
+    polylines = np.asarray(polylines, dtype=np.float64)
+    curves = corner_cubic_beziers(polylines)
+    if polylines.shape[1] < 3:
+        return curves
+
+    closed = np.isclose(polylines[:, 0], polylines[:, -1]).all(axis=1)
+    for mask, handles in ((~closed, _open_handles), (closed, _closed_handles)):
+        if mask.any():
+            h1, h2 = handles(polylines[mask])
+            curves[mask, :, 1] = h1
+            curves[mask, :, 2] = h2
+    return curves
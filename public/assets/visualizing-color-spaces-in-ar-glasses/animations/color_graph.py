@@ -0,0 +1,210 @@
+"""Memoised color space transform graph.
+
+Spaces are nodes and conversions are edges, rooted at sRGB. Each edge is a
+list of stages, either an ``Affine`` (x @ matrix + offset) or a ``Kernel``
+(one of the nonlinear batched converters). When a path is compiled,
+consecutive affine stages -- a matrix, the white-point scale, the display
+normalisation -- are composed into a single affine.
+
+Results are memoised per input array at every node that follows a nonlinear
+stage, so evaluating all display spaces for one lattice runs the gamma, the
+Lab cube root and the shared hue/max/min pass of HSV and HSL exactly once
+each:
+
+    graph = TransformGraph.default()
+    for space in SPACES:
+        positions = graph.evaluate(lattice, space)
+
+Returned arrays are the memoised ones, so copy before modifying them. The
+cache assumes inputs are not mutated in place; call ``clear`` if they are.
+"""
+import weakref
+from functools import partial
+
+import numpy as np
+
+from color_kernels import (
+    FLOAT_DTYPES,
+    LAB_FROM_F,
+    OKLAB_FROM_LMS,
+    OKLAB_LMS,
+    cylinder_to_display_batch,
+    hue_range_to_hsl_batch,
+    hue_range_to_hsv_batch,
+    lab_f_batch,
+    lab_to_lch_batch,
+    lch_to_display_batch,
+    rgb_to_hue_range_batch,
+    rgb_to_xyz_matrix,
+    srgb_to_linear_batch,
+    white_xyz,
+    xyz_to_luv_batch,
+)
+
+ROOT = "sRGB"
+DISPLAY = " display"
+
+
+# ============ Stages ============
+
+class Affine:
+    """Row-vector affine stage: x @ matrix + offset."""
+
+    def __init__(self, matrix, offset=None):
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+        self.offset = np.zeros(3) if offset is None else np.asarray(offset, dtype=np.float64)
+
+    @classmethod
+    def scale(cls, factor, offset=0.0):
+        """Uniform ``x * factor + offset``."""
+        return cls(np.eye(3) * factor, np.full(3, offset))
+
+    def then(self, other):
+        """Single affine equivalent to applying ``self`` then ``other``."""
+        return Affine(self.matrix @ other.matrix, self.offset @ other.matrix + other.offset)
+
+    def __call__(self, x, out=None):
+        matrix = self.matrix.astype(x.dtype, copy=False)
+        out = np.matmul(x, matrix, out=out)
+        out += self.offset.astype(x.dtype, copy=False)
+        return out
+
+
+class Kernel:
+    """Nonlinear stage wrapping a batched ``f(x, out)`` converter."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, x, out=None):
+        return self.func(x, out)
+
+
+def _fuse(stages):
+    """Compose runs of consecutive affine stages into one."""
+    fused = []
+    for stage in stages:
+        if isinstance(stage, Affine) and fused and isinstance(fused[-1], Affine):
+            fused[-1] = fused[-1].then(stage)
+        else:
+            fused.append(stage)
+    return fused
+
+
+# ============ Graph ============
+
+class TransformGraph:
+    """Tree of color spaces rooted at sRGB with memoised evaluation."""
+
+    def __init__(self):
+        self._parent = {}
+        self._plans = {}
+        self._caches = {}
+
+    def add_edge(self, src, dst, *stages):
+        if src != ROOT and src not in self._parent:
+            raise ValueError(f"unknown source space {src!r}")
+        self._parent[dst] = (src, list(stages))
+        self._plans.clear()
+
+    @classmethod
+    def default(cls, white="D65", cat="bradford"):
+        """Graph for every space transform_rgb_to_space supports.
+
+        XYZ and CIELAB are taken under the ``white`` illuminant, adapted with
+        ``cat``; the adaptation is folded into the XYZ matrix.
+        """
+        graph = cls()
+        centered = Affine.scale(5, -2.5)
+
+        graph.add_edge(ROOT, "Linear RGB", Kernel(srgb_to_linear_batch))
+        graph.add_edge("Linear RGB", "XYZ", Affine(rgb_to_xyz_matrix(white, cat).T))
+        graph.add_edge("XYZ", "Lab f", Affine(np.diag(1 / white_xyz(white))), Kernel(lab_f_batch))
+        graph.add_edge("Lab f", "CIELAB", Affine(LAB_FROM_F, [-16.0, 0.0, 0.0]))
+        # HSV and HSL share the hue and channel max/min of one cylindrical pass
+        graph.add_edge(ROOT, "Cylindrical", Kernel(rgb_to_hue_range_batch))
+        graph.add_edge("Cylindrical", "HSV", Kernel(hue_range_to_hsv_batch))
+        graph.add_edge("Cylindrical", "HSL", Kernel(hue_range_to_hsl_batch))
+        graph.add_edge("CIELAB", "CIE LCh", Kernel(lab_to_lch_batch))
+        graph.add_edge("XYZ", "CIELUV", Kernel(partial(xyz_to_luv_batch, white=white)))
+        graph.add_edge("Linear RGB", "LMS'", Affine(OKLAB_LMS.T), Kernel(np.cbrt))
+        graph.add_edge("LMS'", "OKLab", Affine(OKLAB_FROM_LMS.T))
+        graph.add_edge("OKLab", "OKLCh", Kernel(lab_to_lch_batch))
+
+        graph.add_edge(ROOT, ROOT + DISPLAY, centered)
+        graph.add_edge("Linear RGB", "Linear RGB" + DISPLAY, centered)
+        graph.add_edge("XYZ", "XYZ" + DISPLAY, centered)
+        # (L*, a*, b*) -> (a*/40, (L*-50)/20, b*/40)
+        lab_display = Affine([[0, 1 / 20, 0], [1 / 40, 0, 0], [0, 0, 1 / 40]], [0.0, -2.5, 0.0])
+        graph.add_edge("CIELAB", "CIELAB" + DISPLAY, lab_display)
+        graph.add_edge("HSV", "HSV" + DISPLAY, Kernel(cylinder_to_display_batch))
+        graph.add_edge("HSL", "HSL" + DISPLAY, Kernel(cylinder_to_display_batch))
+        # (L, a, b) -> (8a, 5(L - 0.5), 8b)
+        oklab_display = Affine([[0, 5, 0], [8, 0, 0], [0, 0, 8]], [0.0, -2.5, 0.0])
+        graph.add_edge("OKLab", "OKLab" + DISPLAY, oklab_display)
+        graph.add_edge("OKLCh", "OKLCh" + DISPLAY, Kernel(partial(lch_to_display_batch, radius_scale=8.0)))
+        # (L*, u*, v*) -> (u*/50, (L*-50)/20, v*/50)
+        luv_display = Affine([[0, 1 / 20, 0], [1 / 50, 0, 0], [0, 0, 1 / 50]], [0.0, -2.5, 0.0])
+        graph.add_edge("CIELUV", "CIELUV" + DISPLAY, luv_display)
+        graph.add_edge("CIE LCh", "CIE LCh" + DISPLAY, Kernel(
+            partial(lch_to_display_batch, radius_scale=1 / 50, lightness_scale=1 / 100)))
+        return graph
+
+    def _path(self, node):
+        """Edges from the root to ``node`` as (dst, stages) pairs."""
+        if node not in self._parent:
+            raise ValueError(f"unknown space {node!r}")
+        path = []
+        while node != ROOT:
+            src, stages = self._parent[node]
+            path.append((node, stages))
+            node = src
+        return path[::-1]
+
+    def plan(self, node):
+        """Compiled steps to ``node``: [(cache_key, fused stages)].
+
+        A step ends at every node reached through a nonlinear stage, and at
+        ``node`` itself; only those intermediates are materialised.
+        """
+        if node in self._plans:
+            return self._plans[node]
+        steps, pending = [], []
+        for dst, stages in self._path(node):
+            pending.extend(stages)
+            if isinstance(stages[-1], Kernel) or dst == node:
+                steps.append((dst, _fuse(pending)))
+                pending = []
+        self._plans[node] = steps
+        return steps
+
+    def _cache_for(self, rgb):
+        key = id(rgb)
+        cache = self._caches.get(key)
+        if cache is None:
+            cache = self._caches[key] = {}
+            weakref.finalize(rgb, self._caches.pop, key, None)
+        return cache
+
+    def evaluate(self, rgb, space, display=True):
+        """``space`` (display coordinates by default) for (..., 3) sRGB ``rgb``."""
+        if not isinstance(rgb, np.ndarray):
+            rgb = np.asarray(rgb, dtype=np.float64)
+        node = space + DISPLAY if display else space
+        if node == ROOT:
+            return rgb
+
+        cache = self._cache_for(rgb)
+        value = rgb if rgb.dtype in FLOAT_DTYPES else rgb.astype(np.float64)
+        for key, stages in self.plan(node):
+            if key in cache:
+                value = cache[key]
+                continue
+            for stage in stages:
+                value = stage(value)
+            cache[key] = value
+        return value
+
+    def clear(self):
+        """Drop every memoised intermediate."""
+        self._caches.clear()
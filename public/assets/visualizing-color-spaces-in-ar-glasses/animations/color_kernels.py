@@ -0,0 +1,824 @@
+"""Color space math (NumPy only).
+
+The scenes in color_space_transforms.py and rgb_to_lab.py import their
+conversions from here, so batch jobs and worker processes can use them
+without paying for the manim import.
+
+The ``*_batch`` kernels are channel-last: each takes an array of shape
+(..., 3) -- a single color, an (N, 3) point list, a lattice or a whole
+image -- and converts it in one vectorised pass. Pass ``out`` (same shape) to write into a caller-owned
+buffer; ``out`` may be the input array itself.
+
+Kernels are dtype-preserving: float32 input (or a float32 ``out``) stays
+float32 from start to finish, with constants cast down so no step promotes.
+Anything else is computed in float64. Against the float64 path, float32 stays
+within FLOAT32_MAX_DELTA_E on the 0-100 scaled spaces (CIELAB, CIELUV, CIE
+LCh) and within FLOAT32_MAX_ERROR on every other space's values (see
+float32_error).
+
+XYZ and Lab default to D65. The ``white`` / ``cat`` arguments select another
+illuminant and a chromatic adaptation transform (Bradford, CAT02, ...); the
+adaptation matrix is composed into the RGB -> XYZ matrix once and cached, so
+it costs nothing per pixel.
+"""
+import numpy as np
+
+from lattice import rgb_lattice
+
+# ============ Constants ============
+
+SPACES = ("sRGB", "Linear RGB", "XYZ", "CIELAB", "HSV", "HSL", "OKLab", "OKLCh", "CIELUV", "CIE LCh")
+
+# Spaces that only exist as batched kernels
+BATCH_ONLY_SPACES = ("OKLab", "OKLCh", "CIELUV", "CIE LCh")
+
+FLOAT_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+# Documented float32 accuracy bounds against the float64 path
+FLOAT32_MAX_DELTA_E = 1e-3
+FLOAT32_MAX_ERROR = 1e-4
+
+# Linear RGB -> XYZ (D65), same coefficients as linear_to_xyz
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+
+# D65 reference white used to normalise XYZ before the Lab mapping
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# Linear RGB -> white-normalised XYZ, i.e. the Lab input in a single matmul
+RGB_TO_XYZ_WHITE = RGB_TO_XYZ / D65_WHITE[:, None]
+
+LAB_DELTA = 6.0 / 29.0
+
+# f(X), f(Y), f(Z) -> L*, a*, b*  (L* also needs the -16 offset)
+LAB_FROM_F = np.array([
+    [0.0, 500.0, 0.0],
+    [116.0, -500.0, 200.0],
+    [0.0, 0.0, -200.0],
+])
+
+# L* + 16, a*, b* -> f(X), f(Y), f(Z)
+F_FROM_LAB = np.linalg.inv(LAB_FROM_F)
+
+# OKLab (Ottosson): linear sRGB -> LMS, then cube-rooted LMS -> (L, a, b)
+OKLAB_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+OKLAB_FROM_LMS = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+
+# CIE standard illuminants as XYZ white points (2 degree observer, Y = 1)
+ILLUMINANTS = {
+    "A": np.array([1.09850, 1.0, 0.35585]),
+    "C": np.array([0.98074, 1.0, 1.18232]),
+    "D50": np.array([0.96422, 1.0, 0.82521]),
+    "D55": np.array([0.95682, 1.0, 0.92149]),
+    "D65": D65_WHITE,
+    "D75": np.array([0.94972, 1.0, 1.22638]),
+    "E": np.array([1.0, 1.0, 1.0]),
+    "F2": np.array([0.99187, 1.0, 0.67395]),
+    "F7": np.array([0.95044, 1.0, 1.08755]),
+    "F11": np.array([1.00966, 1.0, 0.64370]),
+}
+
+# XYZ -> cone-like response matrices for chromatic adaptation
+CATS = {
+    "bradford": np.array([
+        [0.8951, 0.2664, -0.1614],
+        [-0.7502, 1.7135, 0.0367],
+        [0.0389, -0.0685, 1.0296],
+    ]),
+    "cat02": np.array([
+        [0.7328, 0.4296, -0.1624],
+        [-0.7036, 1.6975, 0.0061],
+        [0.0030, 0.0136, 0.9834],
+    ]),
+    "von kries": np.array([
+        [0.40024, 0.70760, -0.08081],
+        [-0.22630, 1.16532, 0.04570],
+        [0.0, 0.0, 0.91822],
+    ]),
+    "xyz scaling": np.eye(3),
+}
+
+# White point the sRGB primaries (RGB_TO_XYZ) are defined under
+RGB_WHITE = "D65"
+
+
+# ============ Helpers ============
+
+def _prepare(rgb, out):
+    """Coerce the input to a float dtype and allocate ``out`` when not supplied."""
+    rgb = np.asarray(rgb)
+    if rgb.dtype not in FLOAT_DTYPES:
+        rgb = rgb.astype(np.float64)
+    if rgb.shape[-1:] != (3,):
+        raise ValueError(f"expected an array of shape (..., 3), got {rgb.shape}")
+    if out is None:
+        out = np.empty_like(rgb)
+    elif out.shape != rgb.shape:
+        raise ValueError(f"out has shape {out.shape}, expected {rgb.shape}")
+    return rgb, out
+
+
+def _as(const, like):
+    """``const`` in the dtype of ``like`` so float32 work never promotes."""
+    return const if const.dtype == like.dtype else const.astype(like.dtype)
+
+
+def _lab_f(t, out):
+    """CIELAB companding f(t), evaluated in place into ``out``."""
+    low = t <= LAB_DELTA ** 3
+    low_vals = t[low] / (3 * LAB_DELTA ** 2) + 4 / 29
+    np.cbrt(t, out=out)
+    out[low] = low_vals
+    return out
+
+
+def _lab_f_inverse(f, out):
+    """Inverse of _lab_f, evaluated in place into ``out``."""
+    low = f <= LAB_DELTA
+    low_vals = (f[low] - 4 / 29) * (3 * LAB_DELTA ** 2)
+    np.power(f, 3, out=out)
+    out[low] = low_vals
+    return out
+
+
+def _hue(rgb, cmax, delta, out):
+    """Hue in degrees from the channel holding the max, 0 when achromatic.
+
+    Each pixel takes one branch of the scalar converters, selected by mask
+    (B over G over R on ties): R gives (g - b) / delta mod 6, G gives
+    (b - r) / delta + 2, B gives (r - g) / delta + 4. Branches are written
+    with ``where=`` so nothing is gathered or allocated per branch.
+    """
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    chromatic = delta != 0
+    blue = b == cmax
+    blue &= chromatic
+    green = g == cmax
+    green &= chromatic
+    green &= ~blue
+    # out may alias a channel that is still needed
+    hue = np.empty_like(out) if np.shares_memory(out, rgb) else out
+    np.subtract(g, b, out=hue)
+    np.subtract(b, r, out=hue, where=green)
+    np.subtract(r, g, out=hue, where=blue)
+    # Achromatic numerators are already 0
+    np.divide(hue, delta, out=hue, where=chromatic)
+    np.add(hue, 2, out=hue, where=green)
+    np.add(hue, 4, out=hue, where=blue)
+    # G and B hues are now in [1, 5]; only R can be negative, so mod 6 is one add
+    np.add(hue, 6, out=hue, where=hue < 0)
+    hue *= 60
+    if hue is not out:
+        out[...] = hue
+    return out
+
+
+# ============ Illuminants ============
+#
+# Whites are names from ILLUMINANTS or (x, y) chromaticities. Every matrix
+# below is built once per (whites, cat) key and cached, so switching
+# illuminant folds into the matmul the kernels already run.
+
+_matrix_cache = {}
+
+
+def white_xyz(white):
+    """XYZ (Y = 1) of an illuminant name or an (x, y) chromaticity."""
+    if isinstance(white, str):
+        if white not in ILLUMINANTS:
+            raise ValueError(f"unknown illuminant {white!r}, expected one of {tuple(ILLUMINANTS)}")
+        return ILLUMINANTS[white]
+    x, y = white
+    return np.array([x / y, 1.0, (1 - x - y) / y])
+
+
+def _white_key(white):
+    return white if isinstance(white, str) else tuple(float(v) for v in white)
+
+
+def _cached(key, build):
+    if key not in _matrix_cache:
+        _matrix_cache[key] = build()
+    return _matrix_cache[key]
+
+
+def adaptation_matrix(source, dest, cat="bradford"):
+    """Column-vector matrix adapting XYZ under ``source`` to ``dest``.
+
+    ``cat`` is one of CATS; the identity is returned when the whites match.
+    """
+    if cat not in CATS:
+        raise ValueError(f"unknown adaptation {cat!r}, expected one of {tuple(CATS)}")
+
+    def build():
+        src, dst = white_xyz(source), white_xyz(dest)
+        if np.array_equal(src, dst):
+            return np.eye(3)
+        cone = CATS[cat]
+        gain = (cone @ dst) / (cone @ src)
+        return np.linalg.solve(cone, gain[:, None] * cone)
+
+    return _cached(("adapt", _white_key(source), _white_key(dest), cat), build)
+
+
+def rgb_to_xyz_matrix(white="D65", cat="bradford"):
+    """Linear sRGB -> XYZ adapted from RGB_WHITE to ``white``."""
+    def build():
+        if _white_key(white) == RGB_WHITE:
+            return RGB_TO_XYZ
+        return adaptation_matrix(RGB_WHITE, white, cat) @ RGB_TO_XYZ
+
+    return _cached(("rgb_to_xyz", _white_key(white), cat), build)
+
+
+def primaries_matrix(primaries, white):
+    """Linear RGB -> XYZ of a display given its (x, y) primaries and white.
+
+    Columns are the primaries' XYZ, scaled so RGB (1, 1, 1) lands on the
+    white (Y = 1).
+    """
+    primaries = tuple(_white_key(xy) for xy in primaries)
+
+    def build():
+        columns = np.stack([white_xyz(xy) for xy in primaries], axis=1)
+        return columns * np.linalg.solve(columns, white_xyz(white))
+
+    return _cached(("primaries", primaries, _white_key(white)), build)
+
+
+def rgb_to_lab_matrix(white="D65", cat="bradford"):
+    """Linear sRGB -> XYZ under ``white``, normalised by ``white``: the Lab input."""
+    def build():
+        if _white_key(white) == RGB_WHITE:
+            return RGB_TO_XYZ_WHITE
+        return rgb_to_xyz_matrix(white, cat) / white_xyz(white)[:, None]
+
+    return _cached(("rgb_to_lab", _white_key(white), cat), build)
+
+
+# ============ Kernels ============
+
+def srgb_to_linear_batch(rgb, out=None):
+    """Gamma correction: sRGB to linear RGB."""
+    rgb, out = _prepare(rgb, out)
+    low = rgb <= 0.04045
+    low_vals = rgb[low] / 12.92
+    np.add(rgb, 0.055, out=out)
+    out /= 1.055
+    np.power(out, 2.4, out=out)
+    out[low] = low_vals
+    return out
+
+
+def linear_to_xyz_batch(lin, out=None, white="D65", cat="bradford"):
+    """Linear RGB to XYZ under ``white`` as a single matmul."""
+    lin, out = _prepare(lin, out)
+    np.matmul(lin, _as(rgb_to_xyz_matrix(white, cat), out).T, out=out)
+    return out
+
+
+def rgb_to_xyz_batch(rgb, out=None, white="D65", cat="bradford"):
+    """Fused sRGB to XYZ under ``white``: gamma then a single matmul."""
+    rgb, out = _prepare(rgb, out)
+    srgb_to_linear_batch(rgb, out)
+    np.matmul(out, _as(rgb_to_xyz_matrix(white, cat), out).T, out=out)
+    return out
+
+
+def xyz_to_lab_batch(xyz, out=None, white="D65"):
+    """XYZ to CIELAB relative to ``white``, channels ordered (L*, a*, b*)."""
+    xyz, out = _prepare(xyz, out)
+    np.divide(xyz, _as(white_xyz(white), out), out=out)
+    _lab_f(out, out)
+    np.matmul(out, _as(LAB_FROM_F, out), out=out)
+    out[..., 0] -= 16
+    return out
+
+
+def lab_to_xyz_batch(lab, out=None, white="D65"):
+    """CIELAB (L*, a*, b*) relative to ``white`` back to XYZ."""
+    lab, out = _prepare(lab, out)
+    np.copyto(out, lab)
+    out[..., 0] += 16
+    np.matmul(out, _as(F_FROM_LAB, out), out=out)
+    _lab_f_inverse(out, out)
+    out *= _as(white_xyz(white), out)
+    return out
+
+
+def lab_f_batch(t, out=None):
+    """CIELAB companding f(t) of white-normalised XYZ."""
+    t, out = _prepare(t, out)
+    return _lab_f(t, out)
+
+
+def rgb_to_lab_batch(rgb, out=None, white="D65", cat="bradford"):
+    """Fused sRGB to CIELAB: gamma, white-normalised XYZ matmul, cube root.
+
+    For a ``white`` other than D65 the adaptation is part of that matmul.
+    """
+    rgb, out = _prepare(rgb, out)
+    srgb_to_linear_batch(rgb, out)
+    np.matmul(out, _as(rgb_to_lab_matrix(white, cat), out).T, out=out)
+    _lab_f(out, out)
+    np.matmul(out, _as(LAB_FROM_F, out), out=out)
+    out[..., 0] -= 16
+    return out
+
+
+def lab_to_lch_batch(lab, out=None):
+    """(L, a, b) -> (L, C, h) with h in degrees [0, 360); any Lab-like space."""
+    lab, out = _prepare(lab, out)
+    hue = np.degrees(np.arctan2(lab[..., 2], lab[..., 1])) % 360
+    np.hypot(lab[..., 1], lab[..., 2], out=out[..., 1])
+    out[..., 2] = hue
+    if out is not lab:
+        out[..., 0] = lab[..., 0]
+    return out
+
+
+def rgb_to_lch_batch(rgb, out=None, white="D65", cat="bradford"):
+    """sRGB to CIE LCh(ab): CIELAB in polar form, channels (L*, C*, h)."""
+    rgb, out = _prepare(rgb, out)
+    return lab_to_lch_batch(rgb_to_lab_batch(rgb, out, white, cat), out)
+
+
+def rgb_to_oklab_batch(rgb, out=None):
+    """Fused sRGB to OKLab: gamma, LMS matmul, cube root, matmul."""
+    rgb, out = _prepare(rgb, out)
+    srgb_to_linear_batch(rgb, out)
+    np.matmul(out, _as(OKLAB_LMS, out).T, out=out)
+    np.cbrt(out, out=out)
+    np.matmul(out, _as(OKLAB_FROM_LMS, out).T, out=out)
+    return out
+
+
+def rgb_to_oklch_batch(rgb, out=None):
+    """sRGB to OKLCh: OKLab in polar form, channels (L, C, h)."""
+    rgb, out = _prepare(rgb, out)
+    return lab_to_lch_batch(rgb_to_oklab_batch(rgb, out), out)
+
+
+def xyz_to_luv_batch(xyz, out=None, white="D65"):
+    """XYZ to CIELUV relative to ``white``, channels ordered (L*, u*, v*)."""
+    xyz, out = _prepare(xyz, out)
+    wx, wy, wz = (float(v) for v in white_xyz(white))
+    white_denom = wx + 15 * wy + 3 * wz
+
+    # u', v' chromaticities; black has no chromaticity and gets L* = 0 anyway
+    denom = xyz[..., 0] + 15 * xyz[..., 1] + 3 * xyz[..., 2]
+    denom = np.where(denom > 0, denom, np.inf)
+    u = 4 * xyz[..., 0] / denom - 4 * wx / white_denom
+    v = 9 * xyz[..., 1] / denom - 9 * wy / white_denom
+
+    light = out[..., 0]
+    np.divide(xyz[..., 1], wy, out=light)
+    _lab_f(light, light)
+    light *= 116
+    light -= 16
+    np.multiply(light, u, out=out[..., 1])
+    np.multiply(light, v, out=out[..., 2])
+    out[..., 1:] *= 13
+    return out
+
+
+def rgb_to_luv_batch(rgb, out=None, white="D65", cat="bradford"):
+    """sRGB to CIELUV, channels ordered (L*, u*, v*)."""
+    rgb, out = _prepare(rgb, out)
+    return xyz_to_luv_batch(rgb_to_xyz_batch(rgb, out, white, cat), out, white)
+
+
+def rgb_to_hue_range_batch(rgb, out=None):
+    """RGB to (hue, max, min), the shared first step of HSV and HSL.
+
+    Hue is in degrees, max and min are the largest and smallest channel;
+    hue_range_to_hsv_batch / hue_range_to_hsl_batch finish either space
+    from this without touching the RGB again.
+    """
+    rgb, out = _prepare(rgb, out)
+    # Channel-wise: a max over a length-3 last axis is several times slower
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    cmax = np.maximum(np.maximum(r, g), b)
+    cmin = np.minimum(np.minimum(r, g), b)
+    _hue(rgb, cmax, cmax - cmin, out[..., 0])
+    out[..., 1] = cmax
+    out[..., 2] = cmin
+    return out
+
+
+def hue_range_to_hsv_batch(values, out=None):
+    """(hue, max, min) to HSV; ``out`` may be ``values`` itself."""
+    values, out = _prepare(values, out)
+    cmax = values[..., 1]
+    delta = cmax - values[..., 2]
+    if out is not values:
+        out[..., 0] = values[..., 0]
+    value = out[..., 2]
+    value[...] = cmax
+    sat = out[..., 1]
+    sat[...] = 0
+    np.divide(delta, value, out=sat, where=value != 0)
+    return out
+
+
+def hue_range_to_hsl_batch(values, out=None):
+    """(hue, max, min) to HSL; ``out`` may be ``values`` itself."""
+    values, out = _prepare(values, out)
+    cmax, cmin = values[..., 1], values[..., 2]
+    delta = cmax - cmin
+    double_light = np.add(cmax, cmin, out=np.empty_like(cmax))
+    if out is not values:
+        out[..., 0] = values[..., 0]
+    np.divide(double_light, 2, out=out[..., 2])
+    # 1 - |2L - 1|, reusing the 2L buffer
+    denom = double_light
+    denom -= 1
+    np.abs(denom, out=denom)
+    np.subtract(1, denom, out=denom)
+    sat = out[..., 1]
+    sat[...] = 0
+    np.divide(delta, denom, out=sat, where=delta != 0)
+    return out
+
+
+def _cylinder_out(buffer, rgb):
+    """Resolve an hsv/hsl argument: True allocates, False/None skips."""
+    if buffer is True:
+        return np.empty_like(rgb)
+    if buffer is None or buffer is False:
+        return None
+    if buffer.shape != rgb.shape:
+        raise ValueError(f"out has shape {buffer.shape}, expected {rgb.shape}")
+    return buffer
+
+
+def rgb_to_cylindrical_batch(rgb, hsv=True, hsl=True):
+    """RGB to HSV and/or HSL sharing one (hue, max, min) pass.
+
+    ``hsv`` / ``hsl`` are each True (allocate), False (skip) or an output
+    buffer. Returns ``(hsv, hsl)`` with None for a skipped space.
+    """
+    # Validate without allocating an out; the outputs are resolved below
+    rgb = np.asarray(rgb)
+    rgb, _ = _prepare(rgb, rgb)
+    hsv = _cylinder_out(hsv, rgb)
+    hsl = _cylinder_out(hsl, rgb)
+    if hsv is None and hsl is None:
+        return None, None
+
+    # (hue, max, min) goes into the HSL buffer when there is one; HSV is read
+    # from it before HSL is finished in place
+    shared = rgb_to_hue_range_batch(rgb, hsl if hsl is not None else hsv)
+    if hsv is not None:
+        hue_range_to_hsv_batch(shared, hsv)
+    if hsl is not None:
+        hue_range_to_hsl_batch(shared, hsl)
+    return hsv, hsl
+
+
+def rgb_to_hsv_batch(rgb, out=None):
+    """RGB to HSV, hue in degrees."""
+    rgb, out = _prepare(rgb, out)
+    return hue_range_to_hsv_batch(rgb_to_hue_range_batch(rgb, out), out)
+
+
+def rgb_to_hsl_batch(rgb, out=None):
+    """RGB to HSL, hue in degrees."""
+    rgb, out = _prepare(rgb, out)
+    return hue_range_to_hsl_batch(rgb_to_hue_range_batch(rgb, out), out)
+
+
+# Native (undisplayed) value of every space, keyed like transform_rgb_to_space
+CONVERTERS = {
+    "Linear RGB": srgb_to_linear_batch,
+    "XYZ": rgb_to_xyz_batch,
+    "CIELAB": rgb_to_lab_batch,
+    "HSV": rgb_to_hsv_batch,
+    "HSL": rgb_to_hsl_batch,
+    "OKLab": rgb_to_oklab_batch,
+    "OKLCh": rgb_to_oklch_batch,
+    "CIELUV": rgb_to_luv_batch,
+    "CIE LCh": rgb_to_lch_batch,
+}
+
+
+# ============ Transformation Pipeline ============
+
+def cylinder_to_display_batch(values, out=None, radius_scale=2.0):
+    """(hue, radius, height) as in HSV/HSL -> centered cartesian display."""
+    values, out = _prepare(values, out)
+    h_rad = np.radians(values[..., 0])
+    radius = values[..., 1] * radius_scale
+    height = (values[..., 2] - 0.5) * 4
+    out[..., 0] = radius * np.cos(h_rad)
+    out[..., 1] = height
+    out[..., 2] = radius * np.sin(h_rad)
+    return out
+
+
+def lch_to_display_batch(lch, out=None, radius_scale=8.0, lightness_scale=1.0):
+    """(L, C, h) -> the cylinder display, with L * lightness_scale in [0, 1]."""
+    lch, out = _prepare(lch, out)
+    out[..., [0, 2]] = lch[..., [2, 0]]
+    if lch is not out:
+        out[..., 1] = lch[..., 1]
+    out[..., 2] *= lightness_scale
+    return cylinder_to_display_batch(out, out, radius_scale)
+
+
+def transform_rgb_to_space_batch(rgb, space, out=None):
+    """Batched transform_rgb_to_space: (..., 3) sRGB to display coordinates."""
+    rgb, out = _prepare(rgb, out)
+
+    if space == "sRGB":
+        np.subtract(rgb, 0.5, out=out)
+        out *= 5
+
+    elif space == "Linear RGB":
+        srgb_to_linear_batch(rgb, out)
+        out -= 0.5
+        out *= 5
+
+    elif space == "XYZ":
+        rgb_to_xyz_batch(rgb, out)
+        out -= 0.5
+        out *= 5
+
+    elif space == "CIELAB":
+        lab = rgb_to_lab_batch(rgb, out)
+        # a* -> X, L* -> Y, b* -> Z
+        L = lab[..., 0].copy()
+        out[..., 0] = lab[..., 1] / 40
+        out[..., 2] /= 40
+        out[..., 1] = (L - 50) / 20
+
+    elif space == "HSV":
+        hsv = rgb_to_hsv_batch(rgb, out)
+        cylinder_to_display_batch(hsv, out)
+
+    elif space == "HSL":
+        hsl = rgb_to_hsl_batch(rgb, out)
+        cylinder_to_display_batch(hsl, out)
+
+    elif space == "OKLab":
+        lab = rgb_to_oklab_batch(rgb, out)
+        # a -> X, L -> Y, b -> Z; a and b span about +-0.3
+        L = lab[..., 0].copy()
+        out[..., 0] = lab[..., 1] * 8
+        out[..., 2] *= 8
+        out[..., 1] = (L - 0.5) * 5
+
+    elif space == "CIELUV":
+        luv = rgb_to_luv_batch(rgb, out)
+        # u* -> X, L* -> Y, v* -> Z; u* reaches 175 on red
+        L = luv[..., 0].copy()
+        out[..., 0] = luv[..., 1] / 50
+        out[..., 2] /= 50
+        out[..., 1] = (L - 50) / 20
+
+    elif space == "OKLCh":
+        # C tops out near 0.32
+        lch = rgb_to_oklch_batch(rgb, out)
+        lch_to_display_batch(lch, out, radius_scale=8.0)
+
+    elif space == "CIE LCh":
+        # C* tops out near 134
+        lch = rgb_to_lch_batch(rgb, out)
+        lch_to_display_batch(lch, out, radius_scale=1 / 50, lightness_scale=1 / 100)
+
+    else:
+        out[...] = rgb
+
+    return out
+
+
+# ============ Component-first converters ============
+#
+# The original per-color API used by the scenes: inputs are (3, ...) with
+# channels first, e.g. a single RGB triple or ``points.T``.
+
+def srgb_to_linear(rgb):
+    """Gamma correction: sRGB to linear RGB."""
+    return np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+
+
+def linear_to_xyz(rgb, white="D65", cat="bradford"):
+    """Linear RGB to XYZ (D65 unless ``white`` says otherwise)."""
+    r, g, b = rgb
+    # Python floats, so float32 input is not promoted
+    m = rgb_to_xyz_matrix(white, cat).tolist()
+    x = r * m[0][0] + g * m[0][1] + b * m[0][2]
+    y = r * m[1][0] + g * m[1][1] + b * m[1][2]
+    z = r * m[2][0] + g * m[2][1] + b * m[2][2]
+    return np.array([x, y, z])
+
+
+def xyz_to_lab(xyz, white="D65"):
+    """XYZ to CIELAB."""
+    x, y, z = xyz
+    # Normalize for the reference white
+    wx, wy, wz = white_xyz(white).tolist()
+    x, y, z = x / wx, y / wy, z / wz
+
+    delta = 6.0 / 29.0
+    delta3 = delta ** 3
+
+    def f(t):
+        return np.where(t > delta3, t ** (1/3), t / (3 * delta ** 2) + 4/29)
+
+    fx, fy, fz = f(x), f(y), f(z)
+    L = 116 * fy - 16
+    a = 500 * (fx - fy)
+    b = 200 * (fy - fz)
+    return np.array([L, a, b])
+
+
+def rgb_to_hsv(rgb):
+    """RGB to HSV."""
+    r, g, b = rgb
+    cmax = np.maximum(np.maximum(r, g), b)
+    cmin = np.minimum(np.minimum(r, g), b)
+    delta = cmax - cmin
+
+    # Hue
+    h = np.zeros_like(r)
+    mask_r = (cmax == r) & (delta != 0)
+    mask_g = (cmax == g) & (delta != 0)
+    mask_b = (cmax == b) & (delta != 0)
+
+    h = np.where(mask_r, 60 * (((g - b) / np.where(delta == 0, 1, delta)) % 6), h)
+    h = np.where(mask_g, 60 * ((b - r) / np.where(delta == 0, 1, delta) + 2), h)
+    h = np.where(mask_b, 60 * ((r - g) / np.where(delta == 0, 1, delta) + 4), h)
+
+    # Saturation
+    s = np.where(cmax == 0, 0, delta / cmax)
+
+    # Value
+    v = cmax
+
+    return np.array([h, s, v])
+
+
+def rgb_to_hsl(rgb):
+    """RGB to HSL."""
+    r, g, b = rgb
+    cmax = np.maximum(np.maximum(r, g), b)
+    cmin = np.minimum(np.minimum(r, g), b)
+    delta = cmax - cmin
+    L = (cmax + cmin) / 2
+
+    # Hue (same as HSV)
+    h = np.zeros_like(r)
+    mask_r = (cmax == r) & (delta != 0)
+    mask_g = (cmax == g) & (delta != 0)
+    mask_b = (cmax == b) & (delta != 0)
+
+    h = np.where(mask_r, 60 * (((g - b) / np.where(delta == 0, 1, delta)) % 6), h)
+    h = np.where(mask_g, 60 * ((b - r) / np.where(delta == 0, 1, delta) + 2), h)
+    h = np.where(mask_b, 60 * ((r - g) / np.where(delta == 0, 1, delta) + 4), h)
+
+    # Saturation
+    s = np.where(delta == 0, 0, delta / (1 - np.abs(2 * L - 1)))
+
+    return np.array([h, s, L])
+
+
+def transform_rgb_to_space(rgb, space):
+    """Transform RGB coordinates to target color space."""
+    if space in BATCH_ONLY_SPACES:
+        # No component-first converter; run the batched kernel channels-last
+        rgb = np.asarray(rgb)
+        if rgb.dtype not in FLOAT_DTYPES:
+            rgb = rgb.astype(np.float64)
+        channels_last = np.moveaxis(rgb, 0, -1)
+        return np.moveaxis(transform_rgb_to_space_batch(channels_last, space), -1, 0)
+
+    r, g, b = rgb
+
+    if space == "sRGB":
+        return np.array([r - 0.5, g - 0.5, b - 0.5]) * 5  # Centered
+
+    elif space == "Linear RGB":
+        lin = srgb_to_linear(rgb)
+        return (lin - 0.5) * 5
+
+    elif space == "XYZ":
+        lin = srgb_to_linear(rgb)
+        xyz = linear_to_xyz(lin)
+        # Normalize XYZ to display range
+        return np.array([
+            (xyz[0] - 0.5) * 5,
+            (xyz[1] - 0.5) * 5,
+            (xyz[2] - 0.5) * 5
+        ])
+
+    elif space == "CIELAB":
+        lin = srgb_to_linear(rgb)
+        xyz = linear_to_xyz(lin)
+        lab = xyz_to_lab(xyz)
+        # Normalize: L:0-100, a:-128-128, b:-128-128
+        return np.array([
+            lab[1] / 40,      # a* → X
+            (lab[0] - 50) / 20,  # L* → Y
+            lab[2] / 40       # b* → Z
+        ])
+
+    elif space == "HSV":
+        hsv = rgb_to_hsv(rgb)
+        # Convert cylindrical to cartesian
+        h_rad = hsv[0] * np.pi / 180
+        radius = hsv[1] * 2  # Saturation as radius
+        return np.array([
+            radius * np.cos(h_rad),
+            (hsv[2] - 0.5) * 4,  # Value → Y
+            radius * np.sin(h_rad)
+        ])
+
+    elif space == "HSL":
+        hsl = rgb_to_hsl(rgb)
+        h_rad = hsl[0] * np.pi / 180
+        radius = hsl[1] * 2
+        return np.array([
+            radius * np.cos(h_rad),
+            (hsl[2] - 0.5) * 4,  # Lightness → Y
+            radius * np.sin(h_rad)
+        ])
+
+    return rgb
+
+
+def rgb_to_lab(rgb):
+    """Convert RGB (0-1) to LAB coordinates."""
+    r, g, b = rgb
+
+    # sRGB to linear RGB (gamma correction)
+    def linearize(c):
+        return np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+
+    lr, lg, lb = linearize(r), linearize(g), linearize(b)
+
+    # Linear RGB to XYZ (D65)
+    x = lr * 0.4124564 + lg * 0.3575761 + lb * 0.1804375
+    y = lr * 0.2126729 + lg * 0.7151522 + lb * 0.0721750
+    z = lr * 0.0193339 + lg * 0.1191920 + lb * 0.9503041
+
+    # Normalize for D65 white point
+    x, y, z = x / 0.95047, y / 1.0, z / 1.08883
+
+    # XYZ to LAB
+    delta = 6.0 / 29.0
+    delta3 = delta ** 3
+
+    def f(t):
+        return np.where(t > delta3, t ** (1/3), t / (3 * delta ** 2) + 4/29)
+
+    fx, fy, fz = f(x), f(y), f(z)
+
+    L = 116 * fy - 16
+    a = 500 * (fx - fy)
+    b_val = 200 * (fy - fz)
+
+    return L, a, b_val
+
+
+# ============ Accuracy ============
+
+def _cartesian(lch):
+    h = np.radians(lch[..., 2])
+    return np.stack([lch[..., 0], lch[..., 1] * np.cos(h), lch[..., 1] * np.sin(h)], axis=-1)
+
+
+def float32_error(steps=64):
+    """Max float32-vs-float64 error of every space over a steps^3 sRGB lattice.
+
+    Returns ``{space: max abs error}`` on native values, plus the CIE76
+    Delta E of the CIELAB path under ``"CIELAB dE"``.
+    """
+    rgb = rgb_lattice(steps - 1).reshape(-1, 3)
+    rgb32 = rgb.astype(np.float32)
+    errors = {}
+    for space, convert in CONVERTERS.items():
+        if space in ("OKLCh", "CIE LCh"):
+            # Hue is undefined on the gray axis; compare the (L, a, b) it encodes
+            diff = _cartesian(convert(rgb32).astype(np.float64)) - _cartesian(convert(rgb))
+        else:
+            diff = convert(rgb32).astype(np.float64) - convert(rgb)
+        if space in ("HSV", "HSL"):
+            # Hue is in degrees; compare it on the unit scale of the other channels
+            diff[:, 0] = (diff[:, 0] + 180) % 360 - 180
+            diff[:, 0] /= 360
+        errors[space] = float(np.abs(diff).max())
+        if space == "CIELAB":
+            errors["CIELAB dE"] = float(np.linalg.norm(diff, axis=-1).max())
+    return errors
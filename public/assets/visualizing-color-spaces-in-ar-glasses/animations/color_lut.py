@@ -0,0 +1,239 @@
+"""Precomputed 3D LUTs for transform_rgb_to_space.
+
+Each target space is sampled once on a size^3 lattice of the sRGB cube and
+cached on disk as ``.npy``. Queries are then answered by vectorised trilinear
+or tetrahedral interpolation, which skips the ``**2.4`` gamma and the Lab cube
+root entirely.
+
+    python color_lut.py --sizes 17 33 65 --method tetrahedral --dir luts
+"""
+import argparse
+import os
+
+import numpy as np
+
+from color_kernels import SPACES, transform_rgb_to_space_batch
+from lattice import rgb_lattice
+
+LUT_SIZES = (17, 33, 65)
+METHODS = ("trilinear", "tetrahedral")
+
+# Display CIELAB is (a*/40, (L*-50)/20, b*/40); undo the scale to get Delta E
+LAB_DISPLAY_SCALE = np.array([40.0, 20.0, 40.0])
+
+# Pixels interpolated per block, keeps gather temporaries cache-sized
+CHUNK = 1 << 14
+
+
+# ============ Building / Caching ============
+
+def build_lut(space, size=33):
+    """Sample ``space`` on a size^3 lattice of display coordinates."""
+    grid = rgb_lattice(size - 1)
+    return transform_rgb_to_space_batch(grid, space, out=grid)
+
+
+def lut_path(directory, space, size):
+    """File name of the cached LUT for ``space`` at ``size``."""
+    name = space.lower().replace(" ", "_")
+    return os.path.join(directory, f"lut_{name}_{size}.npy")
+
+
+def save_lut(path, lut):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(path, lut)
+
+
+def load_lut(path):
+    """Memory-map a cached LUT (read only)."""
+    return np.load(path, mmap_mode="r")
+
+
+def get_lut(space, size=33, directory="luts"):
+    """Load the cached LUT for ``space``, building and saving it if missing."""
+    path = lut_path(directory, space, size)
+    if os.path.exists(path):
+        return load_lut(path)
+    lut = build_lut(space, size)
+    save_lut(path, lut)
+    return lut
+
+
+# ============ Interpolation ============
+#
+# Every block of CHUNK pixels reuses one set of scratch buffers, all laid
+# out as channel planes (3, n) so the weighting runs over contiguous rows.
+# Corners are gathered from the flat table in its stored dtype, so a
+# float32 LUT is interpolated in float32 throughout.
+
+class _Scratch:
+    """Preallocated per-block buffers for ``n`` pixels in ``dtype``."""
+
+    def __init__(self, n, dtype, corners):
+        self.frac = np.empty((3, n), dtype=dtype)
+        self.base = np.empty((3, n), dtype=np.intp)
+        self.index = np.empty((3, n), dtype=np.intp)
+        self.corner = np.empty((3, n), dtype=np.intp)
+        self.weight = np.empty(n, dtype=dtype)
+        self.rows = np.empty((corners, 3, n), dtype=dtype)
+
+    def view(self, m):
+        """The same buffers cut to the first ``m`` pixels."""
+        part = object.__new__(_Scratch)
+        for name, buffer in vars(self).items():
+            setattr(part, name, buffer[..., :m])
+        return part
+
+
+def _cell(flat_rgb, size, scratch):
+    """Flat table index of each cell's base corner, per channel, and the
+    per-axis fraction of each color in its cell."""
+    base, frac, index = scratch.base, scratch.frac, scratch.index
+    np.clip(flat_rgb.T, 0.0, 1.0, out=frac)
+    frac *= size - 1
+    np.copyto(base, frac, casting="unsafe")
+    np.minimum(base, size - 2, out=base)
+    frac -= base
+    # ((r * size + g) * size + b) * 3 + channel
+    np.multiply(base[0], size, out=index[0])
+    index[0] += base[1]
+    index[0] *= size
+    index[0] += base[2]
+    index[0] *= 3
+    index[1:] = index[0]
+    index[1] += 1
+    index[2] += 2
+    return index, frac
+
+
+def _gather(flat_table, index, offset, scratch, rows):
+    """Table rows at ``index + offset`` lattice points, as (3, n) planes."""
+    np.multiply(offset, 3, out=scratch.corner)
+    scratch.corner += index
+    return flat_table.take(scratch.corner, out=rows)
+
+
+def _trilinear(flat_table, size, rgb, out, scratch):
+    """Lerp the cell's 8 corners along B, then G, then R."""
+    index, frac = _cell(rgb, size, scratch)
+    rows = scratch.rows
+    for corner in range(8):
+        dr, dg, db = (corner >> 2) & 1, (corner >> 1) & 1, corner & 1
+        _gather(flat_table, index, dr * size * size + dg * size + db, scratch, rows[corner])
+    # Pairs (low, high) along one axis collapse into the low slot
+    for axis, step in ((2, 1), (1, 2), (0, 4)):
+        for low in range(0, 8, 2 * step):
+            high = rows[low + step]
+            high -= rows[low]
+            high *= frac[axis]
+            rows[low] += high
+    out[...] = rows[0].T
+    return out
+
+
+def _tetrahedral(flat_table, size, rgb, out, scratch):
+    """Walk the cell diagonal along the axes sorted by fractional offset."""
+    index, frac = _cell(rgb, size, scratch)
+    fr, fg, fb = frac
+    rows, weight = scratch.rows, scratch.weight
+    f_max = np.maximum(np.maximum(fr, fg), fb)
+    f_min = np.minimum(np.minimum(fr, fg), fb)
+    f_mid = fr + fg
+    f_mid += fb
+    f_mid -= f_max
+    f_mid -= f_min
+
+    # First step along the largest offset, last one along the smallest; on
+    # ties either choice is right, the skipped corner gets zero weight
+    step1 = np.full(fr.shape, 1, dtype=np.intp)
+    np.copyto(step1, size, where=fg >= fb)
+    np.copyto(step1, size * size, where=(fr >= fg) & (fr >= fb))
+    step2 = np.full(fr.shape, size * size + size, dtype=np.intp)
+    np.copyto(step2, size * size + 1, where=fg <= fb)
+    np.copyto(step2, size + 1, where=(fr <= fg) & (fr <= fb))
+
+    acc = _gather(flat_table, index, 0, scratch, rows[0])
+    np.subtract(1, f_max, out=weight)
+    acc *= weight
+    for offset, high, low in ((step1, f_max, f_mid), (step2, f_mid, f_min), (size * size + size + 1, f_min, 0)):
+        corner = _gather(flat_table, index, offset, scratch, rows[1])
+        np.subtract(high, low, out=weight)
+        corner *= weight
+        acc += corner
+    out[...] = acc.T
+    return out
+
+
+def apply_lut(lut, rgb, method="tetrahedral", out=None):
+    """Interpolate ``lut`` at (..., 3) sRGB colors in [0, 1].
+
+    Float32 LUTs are interpolated, and by default returned, in float32.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown interpolation method {method!r}, expected one of {METHODS}")
+    interpolate = _tetrahedral if method == "tetrahedral" else _trilinear
+
+    size = lut.shape[0]
+    table = np.asarray(lut)
+    if table.dtype not in (np.float32, np.float64):
+        table = table.astype(np.float64)
+    flat_table = table.reshape(-1)
+    rgb = np.asarray(rgb)
+    if out is None:
+        out = np.empty(rgb.shape, dtype=table.dtype)
+
+    flat_rgb = rgb.reshape(-1, 3)
+    flat_out = out.reshape(-1, 3)
+    n = flat_rgb.shape[0]
+    scratch = _Scratch(min(n, CHUNK), table.dtype, 8 if interpolate is _trilinear else 2)
+    for start in range(0, n, CHUNK):
+        block = slice(start, start + CHUNK)
+        m = min(CHUNK, n - start)
+        part = scratch if m == CHUNK else scratch.view(m)
+        interpolate(flat_table, size, flat_rgb[block], flat_out[block], part)
+    return out
+
+
+# ============ Error Report ============
+
+def lut_error(lut, space, method="tetrahedral", samples=200_000, seed=0):
+    """Max / mean interpolation error of ``lut`` against the exact kernel.
+
+    Errors are Euclidean distances in display units; for CIELAB the
+    display scaling is undone so ``max_delta_e`` is a CIE76 Delta E.
+    """
+    rng = np.random.default_rng(seed)
+    rgb = rng.random((samples, 3))
+    diff = apply_lut(lut, rgb, method) - transform_rgb_to_space_batch(rgb, space)
+    err = np.linalg.norm(diff, axis=1)
+    report = {"max": float(err.max()), "mean": float(err.mean())}
+    if space == "CIELAB":
+        delta_e = np.linalg.norm(diff * LAB_DISPLAY_SCALE, axis=1)
+        report["max_delta_e"] = float(delta_e.max())
+        report["mean_delta_e"] = float(delta_e.mean())
+    return report
+
+
+def error_report(sizes=LUT_SIZES, spaces=SPACES, method="tetrahedral", directory="luts"):
+    """{space: {size: lut_error(...)}} for every requested space and size."""
+    return {
+        space: {size: lut_error(get_lut(space, size, directory), space, method) for size in sizes}
+        for space in spaces
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build color space LUTs and report their error.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(LUT_SIZES))
+    parser.add_argument("--spaces", nargs="+", default=list(SPACES))
+    parser.add_argument("--method", choices=METHODS, default="tetrahedral")
+    parser.add_argument("--dir", default="luts")
+    args = parser.parse_args()
+
+    report = error_report(args.sizes, args.spaces, args.method, args.dir)
+    for space, by_size in report.items():
+        for size, err in by_size.items():
+            line = f"{space:>10}  {size:>3}^3  max {err['max']:.2e}  mean {err['mean']:.2e}"
+            if "max_delta_e" in err:
+                line += f"  max dE76 {err['max_delta_e']:.3f}"
+            print(line)
@@ -0,0 +1,148 @@
+"""Multi-core color conversion over shared memory.
+
+A ColorPool keeps a process pool and two ``multiprocessing.shared_memory``
+blocks (input and output) alive between calls. Each call copies the colors
+into the input block once, and workers convert disjoint row ranges in place
+between the two blocks. Only block names and row bounds are pickled; pixel
+data never is. float32 input is converted in float32 end to end.
+
+    with ColorPool() as pool:
+        lab = pool.convert(image, "CIELAB")
+        display = pool.transform(lattice, "HSV")
+"""
+import multiprocessing as mp
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from color_kernels import CONVERTERS, FLOAT_DTYPES, transform_rgb_to_space_batch
+
+# Below this many colors the pool overhead outweighs the speedup
+MIN_PARALLEL = 1 << 16
+
+# Row ranges handed out per worker, smooths out uneven scheduling
+CHUNKS_PER_WORKER = 4
+
+
+# ============ Worker side ============
+
+_attached = {}
+
+
+def _attach(name):
+    """Attach to a shared block once per worker and keep the handle."""
+    shm = _attached.get(name)
+    if shm is None:
+        # The parent owns the block; a worker's tracker must not unlink it on exit
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        _attached[name] = shm
+    return shm
+
+
+def _release_stale(keep):
+    """Close handles to blocks the parent has since replaced."""
+    for name in [n for n in _attached if n not in keep]:
+        _attached.pop(name).close()
+
+
+def _run(src, dst, space, display):
+    if display:
+        transform_rgb_to_space_batch(src, space, out=dst)
+    else:
+        CONVERTERS[space](src, dst)
+
+
+def _convert_rows(task):
+    src_name, dst_name, dtype, count, start, stop, space, display = task
+    _release_stale((src_name, dst_name))
+    src = np.ndarray((count, 3), dtype=dtype, buffer=_attach(src_name).buf)
+    dst = np.ndarray((count, 3), dtype=dtype, buffer=_attach(dst_name).buf)
+    _run(src[start:stop], dst[start:stop], space, display)
+    del src, dst
+
+
+# ============ Pool ============
+
+class ColorPool:
+    """Reusable process pool converting (..., 3) colors across cores."""
+
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count() or 1
+        self._pool = mp.Pool(self.processes)
+        self._capacity = 0
+        self._src = None
+        self._dst = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _reserve(self, nbytes):
+        """Grow the shared blocks to hold at least ``nbytes`` each."""
+        if nbytes <= self._capacity:
+            return
+        self._free_blocks()
+        capacity = max(nbytes, 2 * self._capacity)
+        self._src = shared_memory.SharedMemory(create=True, size=capacity)
+        self._dst = shared_memory.SharedMemory(create=True, size=capacity)
+        self._capacity = capacity
+
+    def _free_blocks(self):
+        for shm in (self._src, self._dst):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._src = self._dst = None
+        self._capacity = 0
+
+    def _map(self, rgb, space, display, out):
+        rgb = np.asarray(rgb)
+        if rgb.shape[-1:] != (3,):
+            raise ValueError(f"expected an array of shape (..., 3), got {rgb.shape}")
+        dtype = rgb.dtype if rgb.dtype in FLOAT_DTYPES else np.dtype(np.float64)
+        if out is None:
+            out = np.empty(rgb.shape, dtype=dtype)
+        count = rgb.size // 3
+
+        if count < MIN_PARALLEL or self.processes == 1:
+            _run(rgb, out, space, display)
+            return out
+
+        self._reserve(count * 3 * dtype.itemsize)
+        src = np.ndarray((count, 3), dtype=dtype, buffer=self._src.buf)
+        dst = np.ndarray((count, 3), dtype=dtype, buffer=self._dst.buf)
+        src[...] = rgb.reshape(-1, 3)
+
+        bounds = np.linspace(0, count, self.processes * CHUNKS_PER_WORKER + 1).astype(int)
+        tasks = [
+            (self._src.name, self._dst.name, dtype.str, count, start, stop, space, display)
+            for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+        ]
+        self._pool.map(_convert_rows, tasks)
+        out[...] = dst.reshape(out.shape)
+        del src, dst
+        return out
+
+    def transform(self, rgb, space, out=None):
+        """Parallel transform_rgb_to_space_batch (display coordinates)."""
+        return self._map(rgb, space, True, out)
+
+    def convert(self, rgb, space, out=None):
+        """Parallel native conversion, ``space`` as in CONVERTERS."""
+        if space not in CONVERTERS:
+            raise ValueError(f"unknown space {space!r}, expected one of {tuple(CONVERTERS)}")
+        return self._map(rgb, space, False, out)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._free_blocks()
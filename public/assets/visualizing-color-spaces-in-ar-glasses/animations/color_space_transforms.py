@@ -1,142 +1,24 @@
+import os
+
 from manim import *
 import numpy as np
 
-# ============ Color Space Conversion Functions ============
-
-def srgb_to_linear(rgb):
-    """Gamma correction: sRGB to linear RGB."""
-    return np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
-
-def linear_to_xyz(rgb):
-    """Linear RGB to XYZ (D65)."""
-    r, g, b = rgb
-    x = r * 0.4124564 + g * 0.3575761 + b * 0.1804375
-    y = r * 0.2126729 + g * 0.7151522 + b * 0.0721750
-    z = r * 0.0193339 + g * 0.1191920 + b * 0.9503041
-    return np.array([x, y, z])
-
-def xyz_to_lab(xyz):
-    """XYZ to CIELAB."""
-    x, y, z = xyz
-    # Normalize for D65
-    x, y, z = x / 0.95047, y / 1.0, z / 1.08883
-
-    delta = 6.0 / 29.0
-    delta3 = delta ** 3
-
-    def f(t):
-        return np.where(t > delta3, t ** (1/3), t / (3 * delta ** 2) + 4/29)
-
-    fx, fy, fz = f(x), f(y), f(z)
-    L = 116 * fy - 16
-    a = 500 * (fx - fy)
-    b = 200 * (fy - fz)
-    return np.array([L, a, b])
-
-def rgb_to_hsv(rgb):
-    """RGB to HSV."""
-    r, g, b = rgb
-    cmax = np.maximum(np.maximum(r, g), b)
-    cmin = np.minimum(np.minimum(r, g), b)
-    delta = cmax - cmin
-
-    # Hue
-    h = np.zeros_like(r)
-    mask_r = (cmax == r) & (delta != 0)
-    mask_g = (cmax == g) & (delta != 0)
-    mask_b = (cmax == b) & (delta != 0)
-
-    h = np.where(mask_r, 60 * (((g - b) / np.where(delta == 0, 1, delta)) % 6), h)
-    h = np.where(mask_g, 60 * ((b - r) / np.where(delta == 0, 1, delta) + 2), h)
-    h = np.where(mask_b, 60 * ((r - g) / np.where(delta == 0, 1, delta) + 4), h)
-
-    # Saturation
-    s = np.where(cmax == 0, 0, delta / cmax)
-
-    # Value
-    v = cmax
-
-    return np.array([h, s, v])
-
-def rgb_to_hsl(rgb):
-    """RGB to HSL."""
-    r, g, b = rgb
-    cmax = np.maximum(np.maximum(r, g), b)
-    cmin = np.minimum(np.minimum(r, g), b)
-    delta = cmax - cmin
-    L = (cmax + cmin) / 2
-
-    # Hue (same as HSV)
-    h = np.zeros_like(r)
-    mask_r = (cmax == r) & (delta != 0)
-    mask_g = (cmax == g) & (delta != 0)
-    mask_b = (cmax == b) & (delta != 0)
-
-    h = np.where(mask_r, 60 * (((g - b) / np.where(delta == 0, 1, delta)) % 6), h)
-    h = np.where(mask_g, 60 * ((b - r) / np.where(delta == 0, 1, delta) + 2), h)
-    h = np.where(mask_b, 60 * ((r - g) / np.where(delta == 0, 1, delta) + 4), h)
-
-    # Saturation
-    s = np.where(delta == 0, 0, delta / (1 - np.abs(2 * L - 1)))
-
-    return np.array([h, s, L])
-
-# ============ Transformation Pipeline ============
-
-def transform_rgb_to_space(rgb, space):
-    """Transform RGB coordinates to target color space."""
-    r, g, b = rgb
-
-    if space == "sRGB":
-        return np.array([r - 0.5, g - 0.5, b - 0.5]) * 5  # Centered
-
-    elif space == "Linear RGB":
-        lin = srgb_to_linear(rgb)
-        return (lin - 0.5) * 5
-
-    elif space == "XYZ":
-        lin = srgb_to_linear(rgb)
-        xyz = linear_to_xyz(lin)
-        # Normalize XYZ to display range
-        return np.array([
-            (xyz[0] - 0.5) * 5,
-            (xyz[1] - 0.5) * 5,
-            (xyz[2] - 0.5) * 5
-        ])
-
-    elif space == "CIELAB":
-        lin = srgb_to_linear(rgb)
-        xyz = linear_to_xyz(lin)
-        lab = xyz_to_lab(xyz)
-        # Normalize: L:0-100, a:-128-128, b:-128-128
-        return np.array([
-            lab[1] / 40,      # a* → X
-            (lab[0] - 50) / 20,  # L* → Y
-            lab[2] / 40       # b* → Z
-        ])
-
-    elif space == "HSV":
-        hsv = rgb_to_hsv(rgb)
-        # Convert cylindrical to cartesian
-        h_rad = hsv[0] * np.pi / 180
-        radius = hsv[1] * 2  # Saturation as radius
-        return np.array([
-            radius * np.cos(h_rad),
-            (hsv[2] - 0.5) * 4,  # Value → Y
-            radius * np.sin(h_rad)
-        ])
-
-    elif space == "HSL":
-        hsl = rgb_to_hsl(rgb)
-        h_rad = hsl[0] * np.pi / 180
-        radius = hsl[1] * 2
-        return np.array([
-            radius * np.cos(h_rad),
-            (hsl[2] - 0.5) * 4,  # Lightness → Y
-            radius * np.sin(h_rad)
-        ])
-
-    return rgb
+from color_graph import TransformGraph
+from color_kernels import (
+    rgb_to_hsv_batch,
+    rgb_to_lab_batch,
+    rgb_to_luv_batch,
+    rgb_to_oklab_batch,
+    rgb_to_xyz_batch,
+    srgb_to_linear_batch,
+    transform_rgb_to_space,
+)
+from grid_lines import GridLines
+from lattice import axis_polylines, rgb_lattice
+from photo_cloud import point_opacities, voxel_clouds
+from point_cloud import PointCloud, PointCloudMorph
+
+PHOTO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DJ-Khaled-mirror.jpg")
 
 
 class ColorSpaceTransforms(ThreeDScene):
@@ -157,80 +39,21 @@ class ColorSpaceTransforms(ThreeDScene):
         # Grid resolution
         res = 8
 
-        # Generate RGB points
-        points_rgb = []
-        colors = []
+        # RGB lattice, R slowest and B fastest
+        points_rgb = rgb_lattice(res).reshape(-1, 3)
 
-        for i in range(res + 1):
-            for j in range(res + 1):
-                for k in range(res + 1):
-                    r, g, b = i / res, j / res, k / res
-                    points_rgb.append([r, g, b])
-                    colors.append(rgb_to_hex([r, g, b]))
+        # Shared stages (gamma, XYZ, cube root) are computed once per lattice
+        graph = TransformGraph.default()
 
-        points_rgb = np.array(points_rgb)
+        # One point-cloud mobject for the whole lattice
+        dots = PointCloud(graph.evaluate(points_rgb, "sRGB"), points_rgb)
 
-        # Create dots
-        dots = VGroup()
-        for rgb, color in zip(points_rgb, colors):
-            pos = transform_rgb_to_space(rgb, "sRGB")
-            dot = Dot3D(
-                point=[pos[0], pos[1], pos[2]],
-                radius=0.06,
-                color=color
-            )
-            dots.add(dot)
-
-        # Create axis grid lines (like spacetime diagrams)
-        def create_grid_lines(space, res=8):
-            lines = VGroup()
-
-            # Lines along R axis (varying R, fixed G, B)
-            for g_idx in range(res + 1):
-                for b_idx in range(res + 1):
-                    pts = []
-                    for r_idx in range(res + 1):
-                        r, g, b = r_idx / res, g_idx / res, b_idx / res
-                        pos = transform_rgb_to_space(np.array([r, g, b]), space)
-                        pts.append([pos[0], pos[1], pos[2]])
-
-                    if len(pts) > 1:
-                        line = VMobject()
-                        line.set_points_smoothly([np.array(p) for p in pts])
-                        line.set_stroke(RED, width=1, opacity=0.3)
-                        lines.add(line)
-
-            # Lines along G axis
-            for r_idx in range(res + 1):
-                for b_idx in range(res + 1):
-                    pts = []
-                    for g_idx in range(res + 1):
-                        r, g, b = r_idx / res, g_idx / res, b_idx / res
-                        pos = transform_rgb_to_space(np.array([r, g, b]), space)
-                        pts.append([pos[0], pos[1], pos[2]])
-
-                    if len(pts) > 1:
-                        line = VMobject()
-                        line.set_points_smoothly([np.array(p) for p in pts])
-                        line.set_stroke(GREEN, width=1, opacity=0.3)
-                        lines.add(line)
-
-            # Lines along B axis
-            for r_idx in range(res + 1):
-                for g_idx in range(res + 1):
-                    pts = []
-                    for b_idx in range(res + 1):
-                        r, g, b = r_idx / res, g_idx / res, b_idx / res
-                        pos = transform_rgb_to_space(np.array([r, g, b]), space)
-                        pts.append([pos[0], pos[1], pos[2]])
-
-                    if len(pts) > 1:
-                        line = VMobject()
-                        line.set_points_smoothly([np.array(p) for p in pts])
-                        line.set_stroke(BLUE, width=1, opacity=0.3)
-                        lines.add(line)
-
-            return lines
+        # Create axis grid lines (like spacetime diagrams): the lattice is
+        # transformed once and each R, G and B line is a slice of it, drawn
+        # as one multi-subpath mobject per family
+        def create_grid_lines(space):
+            positions = graph.evaluate(points_rgb, space).reshape(res + 1, res + 1, res + 1, 3)
+            return GridLines(axis_polylines(positions), (RED, GREEN, BLUE), stroke_width=1, stroke_opacity=0.3)
 
         # Create axis arrows
         def create_axes(space):
@@ -265,7 +88,7 @@ class ColorSpaceTransforms(ThreeDScene):
             return axes
 
         # Initial grid
-        grid = create_grid_lines("sRGB", res)
+        grid = create_grid_lines("sRGB")
         axes = create_axes("sRGB")
 
         # Show initial state
@@ -287,7 +110,11 @@ class ColorSpaceTransforms(ThreeDScene):
             ("sRGB", "Linear RGB", "Gamma correction (γ = 2.4)"),
             ("Linear RGB", "XYZ", "Matrix transformation"),
             ("XYZ", "CIELAB", "Cube root (perceptual)"),
-            ("CIELAB", "HSV", "Cylindrical mapping"),
+            ("CIELAB", "CIE LCh", "Polar a*b*: chroma and hue"),
+            ("CIE LCh", "CIELUV", "u'v' chromaticity"),
+            ("CIELUV", "OKLab", "LMS cube root (OKLab)"),
+            ("OKLab", "OKLCh", "Polar OKLab"),
+            ("OKLCh", "HSV", "Cylindrical mapping"),
             ("HSV", "sRGB", "Back to sRGB"),
         ]
 
@@ -302,13 +129,10 @@ class ColorSpaceTransforms(ThreeDScene):
             self.add_fixed_in_frame_mobjects(desc_text)
 
             # Compute new positions
-            new_grid = create_grid_lines(to_space, res)
+            new_grid = create_grid_lines(to_space)
             new_axes = create_axes(to_space)
 
-            new_positions = []
-            for rgb in points_rgb:
-                pos = transform_rgb_to_space(rgb, to_space)
-                new_positions.append([pos[0], pos[1], pos[2]])
+            new_positions = graph.evaluate(points_rgb, to_space)
 
             # Animate transformation
             self.play(
@@ -317,7 +141,7 @@ class ColorSpaceTransforms(ThreeDScene):
             )
 
             self.play(
-                *[dot.animate.move_to(pos) for dot, pos in zip(dots, new_positions)],
+                PointCloudMorph(dots, new_positions),
                 Transform(grid, new_grid),
                 Transform(axes, new_axes),
                 Transform(space_label, new_label),
@@ -355,84 +179,52 @@ class ColorSpaceTransforms2D(Scene):
         res = 12
 
         # Generate 2D slice (B = 0.5)
-        points = []
-        colors = []
-        for i in range(res + 1):
-            for j in range(res + 1):
-                r, g = i / res, j / res
-                points.append([r, g, 0.5])
-                colors.append(rgb_to_hex([r, g, 0.5]))
+        rgb_slice = rgb_lattice(res, blue=0.5)
+        points = rgb_slice.reshape(-1, 3)
 
-        points = np.array(points)
-
-        # Create dots
-        dots = VGroup()
-        for rgb, color in zip(points, colors):
-            x = (rgb[0] - 0.5) * 6
-            y = (rgb[1] - 0.5) * 6
-            dot = Dot(point=[x, y, 0], radius=0.08, color=color)
-            dots.add(dot)
-
-        # Create grid lines
-        def create_2d_grid(space):
-            lines = VGroup()
-
-            # Horizontal lines (constant G)
-            for g_idx in range(res + 1):
-                pts = []
-                for r_idx in range(res + 1):
-                    r, g = r_idx / res, g_idx / res
-                    pos = get_2d_pos(r, g, space)
-                    pts.append([pos[0], pos[1], 0])
-
-                line = VMobject()
-                line.set_points_smoothly([np.array(p) for p in pts])
-                line.set_stroke(GREEN, width=1.5, opacity=0.5)
-                lines.add(line)
-
-            # Vertical lines (constant R)
-            for r_idx in range(res + 1):
-                pts = []
-                for g_idx in range(res + 1):
-                    r, g = r_idx / res, g_idx / res
-                    pos = get_2d_pos(r, g, space)
-                    pts.append([pos[0], pos[1], 0])
-
-                line = VMobject()
-                line.set_points_smoothly([np.array(p) for p in pts])
-                line.set_stroke(RED, width=1.5, opacity=0.5)
-                lines.add(line)
-
-            return lines
-
-        def get_2d_pos(r, g, space):
-            rgb = np.array([r, g, 0.5])
-
-            if space == "sRGB":
-                return [(r - 0.5) * 6, (g - 0.5) * 6]
-
-            elif space == "Linear RGB":
-                lin = srgb_to_linear(rgb)
-                return [(lin[0] - 0.5) * 6, (lin[1] - 0.5) * 6]
+        def get_2d_pos(rgb, space):
+            """Positions (..., 3) of (..., 3) colors on the slice, all at once."""
+            if space == "Linear RGB":
+                lin = srgb_to_linear_batch(rgb)
+                x, y = (lin[..., 0] - 0.5) * 6, (lin[..., 1] - 0.5) * 6
 
             elif space == "XYZ":
-                lin = srgb_to_linear(rgb)
-                xyz = linear_to_xyz(lin)
-                return [(xyz[0] - 0.4) * 8, (xyz[1] - 0.4) * 8]
+                xyz = rgb_to_xyz_batch(rgb)
+                x, y = (xyz[..., 0] - 0.4) * 8, (xyz[..., 1] - 0.4) * 8
 
             elif space == "CIELAB":
-                lin = srgb_to_linear(rgb)
-                xyz = linear_to_xyz(lin)
-                lab = xyz_to_lab(xyz)
-                return [lab[1] / 25, (lab[0] - 50) / 18]
+                lab = rgb_to_lab_batch(rgb)
+                x, y = lab[..., 1] / 25, (lab[..., 0] - 50) / 18
+
+            elif space == "OKLab":
+                lab = rgb_to_oklab_batch(rgb)
+                x, y = lab[..., 1] * 15, (lab[..., 0] - 0.5) * 5.5
+
+            elif space == "CIELUV":
+                luv = rgb_to_luv_batch(rgb)
+                x, y = luv[..., 1] / 40, (luv[..., 0] - 50) / 18
 
             elif space == "HSV":
-                hsv = rgb_to_hsv(rgb)
-                h_rad = hsv[0] * np.pi / 180
-                radius = hsv[1] * 3
-                return [radius * np.cos(h_rad), (hsv[2] - 0.5) * 5]
+                hsv = rgb_to_hsv_batch(rgb)
+                radius = hsv[..., 1] * 3
+                x, y = radius * np.cos(np.radians(hsv[..., 0])), (hsv[..., 2] - 0.5) * 5
+
+            else:
+                x, y = (rgb[..., 0] - 0.5) * 6, (rgb[..., 1] - 0.5) * 6
+
+            pos = np.zeros(rgb.shape)
+            pos[..., 0] = x
+            pos[..., 1] = y
+            return pos
 
-            return [(r - 0.5) * 6, (g - 0.5) * 6]
+        # Create dots
+        dots = PointCloud(get_2d_pos(points, "sRGB"), points, point_size=20)
+
+        # Create grid lines: horizontal (constant G) and vertical (constant R)
+        # lines are the rows and columns of the transformed slice
+        def create_2d_grid(space):
+            return GridLines(axis_polylines(get_2d_pos(rgb_slice, space)), (GREEN, RED),
+                             stroke_width=1.5, stroke_opacity=0.5)
 
         # Initial
         grid = create_2d_grid("sRGB")
@@ -458,7 +250,9 @@ class ColorSpaceTransforms2D(Scene):
             ("sRGB", "Linear RGB", "Gamma → Linear", "R (linear)", "G (linear)"),
             ("Linear RGB", "XYZ", "RGB → XYZ", "X", "Y"),
             ("XYZ", "CIELAB", "XYZ → LAB", "a*", "L*"),
-            ("CIELAB", "HSV", "LAB → HSV", "H (cos)", "V"),
+            ("CIELAB", "OKLab", "LAB → OKLab", "a", "L"),
+            ("OKLab", "CIELUV", "OKLab → LUV", "u*", "L*"),
+            ("CIELUV", "HSV", "LUV → HSV", "H (cos)", "V"),
             ("HSV", "sRGB", "HSV → sRGB", "R", "G"),
         ]
 
@@ -477,15 +271,12 @@ class ColorSpaceTransforms2D(Scene):
             new_g_label.move_to([-3.5, 3.5, 0])
 
             # Compute new dot positions
-            new_positions = []
-            for rgb in points:
-                pos = get_2d_pos(rgb[0], rgb[1], to_space)
-                new_positions.append([pos[0], pos[1], 0])
+            new_positions = get_2d_pos(points, to_space)
 
             self.play(FadeIn(desc_text), run_time=0.3)
 
             self.play(
-                *[dot.animate.move_to(pos) for dot, pos in zip(dots, new_positions)],
+                PointCloudMorph(dots, new_positions),
                 Transform(grid, new_grid),
                 Transform(space_label, new_label),
                 Transform(r_label, new_r_label),
@@ -504,5 +295,53 @@ class ColorSpaceTransforms2D(Scene):
         )
 
 
+class PhotoColorSpaceTransforms(ThreeDScene):
+    """A photo's pixel distribution in each space, as a voxel-binned point cloud."""
+
+    def construct(self):
+        self.set_camera_orientation(phi=70 * DEGREES, theta=-45 * DEGREES)
+
+        title = Text("Photo in Color Spaces", font_size=36)
+        title.to_corner(UL)
+        self.add_fixed_in_frame_mobjects(title)
+
+        spaces = ["sRGB", "Linear RGB", "XYZ", "CIELAB", "CIE LCh", "OKLab", "HSV"]
+        # One pass over the image bins every space; a few thousand dots at most
+        clouds = voxel_clouds(PHOTO_PATH, spaces, bins=24, max_points=3000)
+
+        def create_cloud(space):
+            cloud = clouds[space]
+            # Denser voxels drawn brighter: pre-multiplied opacity shows under Cairo
+            return PointCloud(cloud["positions"], cloud["rgb"], point_opacities(cloud["counts"]))
+
+        space_label = Text(spaces[0], font_size=28, color=YELLOW)
+        space_label.to_corner(UR)
+        self.add_fixed_in_frame_mobjects(space_label)
+
+        dots = create_cloud(spaces[0])
+        self.add(title)
+        self.play(FadeIn(dots), FadeIn(space_label), run_time=2)
+        self.begin_ambient_camera_rotation(rate=0.1)
+        self.wait(1)
+
+        for space in spaces[1:]:
+            new_label = Text(space, font_size=28, color=YELLOW)
+            new_label.to_corner(UR)
+            self.add_fixed_in_frame_mobjects(new_label)
+
+            new_dots = create_cloud(space)
+            self.play(
+                ReplacementTransform(dots, new_dots),
+                Transform(space_label, new_label),
+                run_time=3,
+                rate_func=smooth
+            )
+            dots = new_dots
+            self.wait(1.5)
+
+        self.stop_ambient_camera_rotation()
+        self.play(FadeOut(dots), FadeOut(title), FadeOut(space_label), run_time=1)
+
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,152 @@
+"""Exact 24-bit sRGB index tables, memory-mapped.
+
+8-bit sRGB has only 2^24 colors, so every answer can be precomputed. A build
+step runs the batched converters once over all of them and stores the result
+as a (2^24, 3) ``.npy`` table of float16 or uint16 (96 MiB per space).
+Converting a uint8 image is then one gather: index = R << 16 | G << 8 | B.
+
+Tables are opened with ``np.load(mmap_mode="r")``, so only the pages holding
+colors that are actually looked up are ever read from disk.
+
+    python color_table.py --spaces CIELAB HSV HSL --dtype uint16 --dir tables
+"""
+import argparse
+import os
+
+import numpy as np
+
+from color_kernels import rgb_to_hsl_batch, rgb_to_hsv_batch, rgb_to_lab_batch
+
+TABLE_COLORS = 1 << 24
+TABLE_DTYPES = ("float16", "uint16")
+
+# Converter and (low, high) range per channel, used for the uint16 encoding
+TABLE_SPACES = {
+    "CIELAB": (rgb_to_lab_batch, np.array([0.0, -128.0, -128.0]), np.array([100.0, 128.0, 128.0])),
+    "HSV": (rgb_to_hsv_batch, np.array([0.0, 0.0, 0.0]), np.array([360.0, 1.0, 1.0])),
+    "HSL": (rgb_to_hsl_batch, np.array([0.0, 0.0, 0.0]), np.array([360.0, 1.0, 1.0])),
+}
+
+# Colors converted per block while building, bounds the build's memory
+BUILD_BLOCK = 1 << 20
+
+
+# ============ Encoding ============
+
+def _space(space):
+    if space not in TABLE_SPACES:
+        raise ValueError(f"no index table for {space!r}, expected one of {tuple(TABLE_SPACES)}")
+    return TABLE_SPACES[space]
+
+
+def encode(values, space, dtype):
+    """Float space values -> table storage dtype."""
+    if dtype == "float16":
+        return values.astype(np.float16)
+    _, low, high = _space(space)
+    scaled = (values - low) / (high - low) * 65535
+    return np.clip(np.rint(scaled), 0, 65535).astype(np.uint16)
+
+
+def decode(stored, space):
+    """Table storage -> float32 space values."""
+    if stored.dtype == np.float16:
+        return stored.astype(np.float32)
+    _, low, high = _space(space)
+    scale = ((high - low) / 65535).astype(np.float32)
+    return stored.astype(np.float32) * scale + low.astype(np.float32)
+
+
+def codes_to_rgb(codes):
+    """24-bit color codes -> (N, 3) sRGB in [0, 1]."""
+    rgb = np.empty((codes.shape[0], 3))
+    rgb[:, 0] = codes >> 16
+    rgb[:, 1] = (codes >> 8) & 0xFF
+    rgb[:, 2] = codes & 0xFF
+    rgb /= 255
+    return rgb
+
+
+def rgb8_to_codes(rgb8):
+    """(..., 3) uint8 sRGB -> (...) 24-bit color codes."""
+    rgb8 = np.asarray(rgb8)
+    if rgb8.dtype != np.uint8:
+        raise TypeError(f"index tables need uint8 input, got {rgb8.dtype}")
+    codes = rgb8[..., 0].astype(np.intp) << 16
+    codes |= rgb8[..., 1].astype(np.intp) << 8
+    codes |= rgb8[..., 2]
+    return codes
+
+
+# ============ Build / Load ============
+
+def table_path(directory, space, dtype):
+    name = space.lower().replace(" ", "_")
+    return os.path.join(directory, f"table_{name}_{dtype}.npy")
+
+
+def build_table(space, path, dtype="uint16"):
+    """Convert all 2^24 sRGB colors and write them straight to ``path``."""
+    if dtype not in TABLE_DTYPES:
+        raise ValueError(f"unknown table dtype {dtype!r}, expected one of {TABLE_DTYPES}")
+    convert, _, _ = _space(space)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(TABLE_COLORS, 3))
+    values = np.empty((BUILD_BLOCK, 3))
+    for start in range(0, TABLE_COLORS, BUILD_BLOCK):
+        rgb = codes_to_rgb(np.arange(start, start + BUILD_BLOCK))
+        convert(rgb, values)
+        table[start:start + BUILD_BLOCK] = encode(values, space, dtype)
+    table.flush()
+    return table
+
+
+def load_table(path):
+    """Lazily memory-map a built table; nothing is read until it is indexed."""
+    return np.load(path, mmap_mode="r")
+
+
+def get_table(space, dtype="uint16", directory="tables"):
+    """Open the table for ``space``, building it on first use."""
+    path = table_path(directory, space, dtype)
+    if not os.path.exists(path):
+        build_table(space, path, dtype)
+    return load_table(path)
+
+
+# ============ Lookup ============
+
+def lookup(table, rgb8, space=None):
+    """Convert (..., 3) uint8 sRGB with one gather.
+
+    Returns the raw stored values; pass ``space`` to decode them to float32.
+    """
+    stored = table[rgb8_to_codes(rgb8)]
+    return stored if space is None else decode(stored, space)
+
+
+def table_error(table, space):
+    """Max absolute quantisation error per channel over all 2^24 colors."""
+    convert, _, _ = _space(space)
+    worst = np.zeros(3)
+    values = np.empty((BUILD_BLOCK, 3))
+    for start in range(0, TABLE_COLORS, BUILD_BLOCK):
+        rgb = codes_to_rgb(np.arange(start, start + BUILD_BLOCK))
+        convert(rgb, values)
+        err = np.abs(decode(table[start:start + BUILD_BLOCK], space) - values)
+        np.maximum(worst, err.max(axis=0), out=worst)
+    return worst
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build 24-bit sRGB index tables.")
+    parser.add_argument("--spaces", nargs="+", default=list(TABLE_SPACES))
+    parser.add_argument("--dtype", choices=TABLE_DTYPES, default="uint16")
+    parser.add_argument("--dir", default="tables")
+    args = parser.parse_args()
+
+    for space in args.spaces:
+        path = table_path(args.dir, space, args.dtype)
+        table = build_table(space, path, args.dtype)
+        err = table_error(table, space)
+        print(f"{space:>6}  {path}  max error per channel {np.array2string(err, precision=4)}")
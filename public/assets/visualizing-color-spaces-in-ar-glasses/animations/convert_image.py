@@ -0,0 +1,98 @@
+"""Tiled, bounded-memory RGB image converter.
+
+Converts an RGB image or raw buffer to Linear RGB, XYZ, CIELAB, HSV or HSL
+with the batched kernels. Input and output are both memory-mapped and the
+image is processed in bands of rows through one reused scratch buffer in the
+output dtype (float32 by default), so peak memory depends on ``--rows`` and
+the width, not the height.
+
+    python convert_image.py pano.npy pano_lab.npy --space CIELAB
+    python convert_image.py frame.raw frame_hsv.npy --space HSV --width 8192 --height 4096
+    python convert_image.py photo.jpg photo_xyz.f32 --space XYZ
+
+``.npy`` and raw inputs are mapped directly. Other formats are decoded once
+with Pillow, which holds the 8-bit image in memory; convert them to ``.npy``
+first if that matters. Outputs ending in ``.npy`` are written with a header,
+anything else is written as a headerless raw buffer.
+"""
+import argparse
+
+import numpy as np
+
+from color_kernels import CONVERTERS, FLOAT_DTYPES
+
+# Integer inputs are normalised to [0, 1] by their full-scale value
+FULL_SCALE = {np.dtype(np.uint8): 255.0, np.dtype(np.uint16): 65535.0}
+
+DEFAULT_ROWS = 256
+
+
+# ============ I/O ============
+
+def open_input(path, width=None, height=None, channels=3, dtype="uint8"):
+    """Memory-map ``path`` as an (H, W, C) array."""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if width is not None and height is not None:
+        return np.memmap(path, dtype=dtype, mode="r", shape=(height, width, channels))
+
+    from PIL import Image
+    return np.asarray(Image.open(path).convert("RGB"))
+
+
+def open_output(path, shape, dtype="float32"):
+    """Writable (H, W, 3) memory map for the converted image."""
+    if path.endswith(".npy"):
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+
+
+# ============ Conversion ============
+
+def convert_tiled(src, dst, space, rows=DEFAULT_ROWS):
+    """Convert ``src`` (H, W, >=3) into ``dst`` (H, W, 3) one band of rows at a time."""
+    if space not in CONVERTERS:
+        raise ValueError(f"unknown space {space!r}, expected one of {tuple(CONVERTERS)}")
+    convert = CONVERTERS[space]
+    height, width = src.shape[:2]
+    scale = FULL_SCALE.get(src.dtype)
+
+    work_dtype = dst.dtype if dst.dtype in FLOAT_DTYPES else np.float64
+    scratch = np.empty((rows, width, 3), dtype=work_dtype)
+    for top in range(0, height, rows):
+        band = src[top:top + rows, :, :3]
+        tile = scratch[:band.shape[0]]
+        if scale is None:
+            tile[...] = band
+        else:
+            np.divide(band, scale, out=tile)
+        convert(tile, tile)
+        dst[top:top + rows] = tile
+    if hasattr(dst, "flush"):
+        dst.flush()
+    return dst
+
+
+def convert_file(src_path, dst_path, space, rows=DEFAULT_ROWS, out_dtype="float32", **raw):
+    src = open_input(src_path, **raw)
+    dst = open_output(dst_path, src.shape[:2] + (3,), out_dtype)
+    return convert_tiled(src, dst, space, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert an RGB image to another color space in bounded memory.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--space", choices=list(CONVERTERS), default="CIELAB")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows per tile")
+    parser.add_argument("--out-dtype", choices=("float32", "float64"), default="float32")
+    parser.add_argument("--width", type=int, help="raw input width")
+    parser.add_argument("--height", type=int, help="raw input height")
+    parser.add_argument("--channels", type=int, default=3, help="raw input channels")
+    parser.add_argument("--dtype", default="uint8", help="raw input dtype")
+    args = parser.parse_args()
+
+    convert_file(
+        args.input, args.output, args.space, args.rows, args.out_dtype,
+        width=args.width, height=args.height, channels=args.channels, dtype=args.dtype,
+    )
@@ -0,0 +1,134 @@
+"""Export color space transforms as .cube files and Hald / strip PNG textures.
+
+Lets the on-device shader (ColorSpaceTransform, see full_space_mat.txt)
+replace the per-fragment gamma, matrix and cube root with one 3D texture
+fetch. Every space of transform_rgb_to_space is sampled with color_lut, and
+each table is normalised per channel to [0, 1]:
+
+    position = range_min + texel * (range_max - range_min)
+
+The ranges and the error of every size/format go to ``report.json``.
+
+Formats:
+    <space>_<size>.cube          Adobe/Resolve 3D LUT, R fastest, 6 decimals
+    <space>_<size>_strip.png     size x size^2 strip, B slices side by side
+    <space>_hald<level>.png      Hald CLUT, level^2 cube in a level^3 square
+
+    python export_luts.py --sizes 17 33 65 --hald-levels 4 6 8 --dir exported
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+from color_kernels import SPACES
+from color_lut import LUT_SIZES, build_lut, lut_error
+
+HALD_LEVELS = (4, 6, 8)
+
+
+# ============ Normalisation ============
+
+def value_range(lut):
+    """Per-channel (min, max) of a LUT."""
+    return lut.min(axis=(0, 1, 2)), lut.max(axis=(0, 1, 2))
+
+
+def normalise(lut, low, high):
+    return (lut - low) / np.where(high > low, high - low, 1)
+
+
+def quantise8(lut, low, high):
+    """8-bit texels of ``lut`` and the LUT they decode back to."""
+    texels = np.rint(normalise(lut, low, high) * 255).astype(np.uint8)
+    decoded = low + texels / 255 * (high - low)
+    return texels, decoded
+
+
+# ============ Writers ============
+
+def write_cube(path, lut, low, high, title):
+    """.cube with normalised values; the decode range goes in comments."""
+    size = lut.shape[0]
+    # .cube order is R fastest, then G, then B
+    rows = normalise(lut, low, high).transpose(2, 1, 0, 3).reshape(-1, 3)
+    with open(path, "w") as f:
+        f.write(f'TITLE "{title}"\n')
+        f.write(f"# RANGE_MIN {low[0]:.6f} {low[1]:.6f} {low[2]:.6f}\n")
+        f.write(f"# RANGE_MAX {high[0]:.6f} {high[1]:.6f} {high[2]:.6f}\n")
+        f.write(f"LUT_3D_SIZE {size}\n")
+        f.write("DOMAIN_MIN 0.0 0.0 0.0\n")
+        f.write("DOMAIN_MAX 1.0 1.0 1.0\n")
+        np.savetxt(f, rows, fmt="%.6f")
+
+
+def strip_image(texels):
+    """(size, size, size, 3) texels -> (size, size^2, 3), pixel [g, b*size + r]."""
+    size = texels.shape[0]
+    return texels.transpose(1, 2, 0, 3).reshape(size, size * size, 3)
+
+
+def hald_image(texels):
+    """(level^2,)*3 texels -> (level^3, level^3, 3) Hald CLUT, R fastest."""
+    side = round(texels.shape[0] ** 1.5)
+    return texels.transpose(2, 1, 0, 3).reshape(side, side, 3)
+
+
+# ============ Export ============
+
+def export_space(space, directory, sizes=LUT_SIZES, hald_levels=HALD_LEVELS):
+    """Write every format for ``space``; returns its report entry."""
+    slug = space.lower().replace(" ", "_")
+    entry = {"sizes": {}, "hald": {}}
+
+    for size in sizes:
+        lut = build_lut(space, size)
+        low, high = value_range(lut)
+        write_cube(os.path.join(directory, f"{slug}_{size}.cube"), lut, low, high, f"{space} {size}")
+        texels, decoded = quantise8(lut, low, high)
+        Image.fromarray(strip_image(texels)).save(os.path.join(directory, f"{slug}_{size}_strip.png"))
+        entry["sizes"][size] = {
+            "range": [low.tolist(), high.tolist()],
+            "cube": lut_error(lut, space, "trilinear"),
+            "png8": lut_error(decoded, space, "trilinear"),
+        }
+
+    for level in hald_levels:
+        lut = build_lut(space, level * level)
+        low, high = value_range(lut)
+        texels, decoded = quantise8(lut, low, high)
+        Image.fromarray(hald_image(texels)).save(os.path.join(directory, f"{slug}_hald{level}.png"))
+        entry["hald"][level] = {
+            "range": [low.tolist(), high.tolist()],
+            "png8": lut_error(decoded, space, "trilinear"),
+        }
+    return entry
+
+
+def export_all(directory, spaces=SPACES, sizes=LUT_SIZES, hald_levels=HALD_LEVELS):
+    os.makedirs(directory, exist_ok=True)
+    report = {space: export_space(space, directory, sizes, hald_levels) for space in spaces}
+    with open(os.path.join(directory, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export color space LUTs as .cube and PNG textures.")
+    parser.add_argument("--spaces", nargs="+", default=list(SPACES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(LUT_SIZES))
+    parser.add_argument("--hald-levels", type=int, nargs="+", default=list(HALD_LEVELS))
+    parser.add_argument("--dir", default="exported")
+    args = parser.parse_args()
+
+    report = export_all(args.dir, args.spaces, args.sizes, args.hald_levels)
+    for space, entry in report.items():
+        for size, err in entry["sizes"].items():
+            line = f"{space:>10}  {size:>3}^3  cube max {err['cube']['max']:.2e}  png8 max {err['png8']['max']:.2e}"
+            if "max_delta_e" in err["cube"]:
+                line += f"  dE76 {err['cube']['max_delta_e']:.3f} / {err['png8']['max_delta_e']:.3f}"
+            print(line)
+        for level, err in entry["hald"].items():
+            print(f"{space:>10}  hald {level}  png8 max {err['png8']['max']:.2e}")
@@ -0,0 +1,167 @@
+"""Batched gamut mapping onto displays with custom primaries.
+
+A display is described by the xy chromaticities of its red, green and blue
+primaries and of its white point. Its linear RGB <-> XYZ matrices are
+built from color_kernels' primaries_matrix and adaptation_matrix and
+cached with them, once per (primaries, white) pair.
+
+Lab is taken relative to the display's own white (relative colorimetric),
+so neutral colors always land on the display's gray axis; for a D65 display
+this is exactly the Lab of xyz_to_lab_batch.
+
+Out-of-gamut colors keep their L* and hue and lose chroma: the largest
+in-gamut chroma is found by bisection, all points in lock-step, so a whole
+video frame costs GAMUT_ITERATIONS vectorised Lab -> RGB passes:
+
+    mapped, outside = map_to_gamut(lab, **DISPLAYS["Display P3"])
+
+    python gamut_map.py frame.png --display "Rec. 709" --output frame_709.npy
+"""
+import argparse
+
+import numpy as np
+
+from color_kernels import (
+    _cached,
+    _white_key,
+    adaptation_matrix,
+    lab_to_xyz_batch,
+    primaries_matrix,
+    rgb_to_lab_batch,
+    xyz_to_lab_batch,
+)
+
+# xy chromaticities of (red, green, blue) primaries and white
+DISPLAYS = {
+    "Rec. 709": {"primaries": ((0.64, 0.33), (0.30, 0.60), (0.15, 0.06)), "white": (0.3127, 0.3290)},
+    "Display P3": {"primaries": ((0.680, 0.320), (0.265, 0.690), (0.150, 0.060)), "white": (0.3127, 0.3290)},
+    "Rec. 2020": {"primaries": ((0.708, 0.292), (0.170, 0.797), (0.131, 0.046)), "white": (0.3127, 0.3290)},
+}
+
+SRGB_PRIMARIES = DISPLAYS["Rec. 709"]["primaries"]
+D65_XY = DISPLAYS["Rec. 709"]["white"]
+
+# Bisection steps; chroma is resolved to C * 2^-GAMUT_ITERATIONS
+GAMUT_ITERATIONS = 20
+
+# Linear RGB slack still counted as in gamut; covers the rounding between
+# RGB_TO_XYZ / D65_WHITE and matrices derived from xy chromaticities
+GAMUT_EPSILON = 2e-4
+
+
+# ============ Display matrices ============
+
+def display_matrices(primaries=SRGB_PRIMARIES, white=D65_XY):
+    """(to_lab_xyz, from_lab_xyz) row-vector matrices of a display, cached.
+
+    ``rgb @ to_lab_xyz`` is the XYZ that xyz_to_lab_batch expects, Bradford
+    adapted from the display white to D65; ``xyz @ from_lab_xyz`` inverts it.
+    """
+    def build():
+        to_lab = (adaptation_matrix(white, "D65") @ primaries_matrix(primaries, white)).T
+        return to_lab, np.linalg.inv(to_lab)
+
+    key = ("display", tuple(_white_key(xy) for xy in primaries), _white_key(white))
+    return _cached(key, build)
+
+
+def lab_to_display(lab, primaries=SRGB_PRIMARIES, white=D65_XY, out=None):
+    """Lab -> the display's linear RGB, unclipped."""
+    _, from_lab = display_matrices(primaries, white)
+    out = lab_to_xyz_batch(lab, out)
+    np.matmul(out, from_lab.astype(out.dtype, copy=False), out=out)
+    return out
+
+
+def display_to_lab(linear, primaries=SRGB_PRIMARIES, white=D65_XY, out=None):
+    """The display's linear RGB -> Lab."""
+    to_lab, _ = display_matrices(primaries, white)
+    xyz = np.matmul(linear, to_lab)
+    return xyz_to_lab_batch(xyz, xyz if out is None else out)
+
+
+# ============ Gamut mapping ============
+
+def _inside(linear):
+    return np.all((linear >= -GAMUT_EPSILON) & (linear <= 1 + GAMUT_EPSILON), axis=-1)
+
+
+def in_gamut(lab, primaries=SRGB_PRIMARIES, white=D65_XY):
+    """Boolean (...,) mask of Lab colors the display can show."""
+    return _inside(lab_to_display(lab, primaries, white))
+
+
+def map_to_gamut(lab, primaries=SRGB_PRIMARIES, white=D65_XY, iterations=GAMUT_ITERATIONS, out=None):
+    """Pull out-of-gamut Lab colors onto the display's gamut boundary.
+
+    L* is clamped to [0, 100]; then chroma is reduced at constant L* and
+    hue to the largest in-gamut value. Returns the mapped Lab and the mask
+    of colors that were outside.
+    """
+    lab = np.asarray(lab)
+    if lab.dtype not in (np.float32, np.float64):
+        lab = lab.astype(np.float64)
+    if out is None:
+        out = lab.copy()
+    else:
+        np.copyto(out, lab)
+    flat = out.reshape(-1, 3)
+    np.clip(flat[:, 0], 0, 100, out=flat[:, 0])
+
+    outside = ~_inside(lab_to_display(flat, primaries, white))
+    idx = np.flatnonzero(outside)
+    if idx.size:
+        # Bisect the chroma scale in [0, 1]; 0 (the gray axis) is in gamut
+        base = flat[idx]
+        low = np.zeros(idx.size, dtype=flat.dtype)
+        high = np.ones(idx.size, dtype=flat.dtype)
+        trial = np.empty_like(base)
+        for _ in range(iterations):
+            mid = (low + high) / 2
+            trial[:, 0] = base[:, 0]
+            np.multiply(base[:, 1:], mid[:, None], out=trial[:, 1:])
+            ok = _inside(lab_to_display(trial, primaries, white, out=trial))
+            low = np.where(ok, mid, low)
+            high = np.where(ok, high, mid)
+        base[:, 1:] *= low[:, None]
+        flat[idx] = base
+    return out, outside.reshape(lab.shape[:-1])
+
+
+def map_image(rgb, primaries=SRGB_PRIMARIES, white=D65_XY, iterations=GAMUT_ITERATIONS):
+    """sRGB image (..., 3) in [0, 1] -> the display's linear RGB, gamut mapped."""
+    mapped, outside = map_to_gamut(rgb_to_lab_batch(rgb), primaries, white, iterations)
+    linear = lab_to_display(mapped, primaries, white, out=mapped)
+    return np.clip(linear, 0, 1, out=linear), outside
+
+
+if __name__ == "__main__":
+    import time
+
+    from convert_image import FULL_SCALE, open_input
+
+    parser = argparse.ArgumentParser(description="Gamut-map an sRGB image onto a display's primaries.")
+    parser.add_argument("input")
+    parser.add_argument("--display", choices=list(DISPLAYS), default="Rec. 709")
+    parser.add_argument("--primaries", type=float, nargs=6, metavar=("RX", "RY", "GX", "GY", "BX", "BY"),
+                        help="custom primaries, overrides --display")
+    parser.add_argument("--white", type=float, nargs=2, metavar=("X", "Y"), help="custom white point")
+    parser.add_argument("--iterations", type=int, default=GAMUT_ITERATIONS)
+    parser.add_argument("--output", help="write the display's linear RGB as .npy")
+    args = parser.parse_args()
+
+    display = dict(DISPLAYS[args.display])
+    if args.primaries:
+        display["primaries"] = tuple(zip(args.primaries[::2], args.primaries[1::2]))
+    if args.white:
+        display["white"] = tuple(args.white)
+
+    image = open_input(args.input)[..., :3]
+    rgb = image / FULL_SCALE.get(image.dtype, 1.0)
+    start = time.perf_counter()
+    linear, outside = map_image(rgb, iterations=args.iterations, **display)
+    seconds = time.perf_counter() - start
+    print(f"{outside.mean():.2%} of {outside.size} pixels out of gamut, "
+          f"{outside.size / seconds / 1e6:.2f} Mpixel/s")
+    if args.output:
+        np.save(args.output, linear.astype(np.float32))
@@ -0,0 +1,232 @@
+"""Adaptive gamut-boundary mesh of the sRGB cube in display coordinates.
+
+The six cube faces start as a coarse uniform triangulation and are refined
+where transform_rgb_to_space bends: an edge is split when the image of its
+midpoint is further than ``tolerance`` (display units) from the midpoint of
+its mapped endpoints, i.e. where the chord misses the curve. Triangles are
+split along their marked edges (into 2, 3 or 4), so the split decision
+belongs to the edge and neighbouring triangles always agree: the mesh stays
+watertight, including across the cube's edges.
+
+Vertices live on an integer lattice of the cube with 2^max_level steps per
+side, so midpoints are exact and shared vertices are merged by their code.
+The result is a compact indexed mesh:
+
+    rgb, positions, faces = gamut_mesh("CIELAB", tolerance=0.01)
+
+    python gamut_mesh.py --spaces CIELAB HSV --tolerance 0.01 --dir meshes
+"""
+import argparse
+import os
+
+import numpy as np
+
+from color_kernels import SPACES, transform_rgb_to_space_batch
+
+# Display-unit chord error an edge may have before it is split
+TOLERANCE = 0.01
+
+# Uniform subdivisions per face side before refinement: 2^MIN_LEVEL
+MIN_LEVEL = 2
+
+# Finest lattice: 2^MAX_LEVEL steps per cube side
+MAX_LEVEL = 8
+
+# Triangle corners of each edge, in winding order
+_EDGES = np.array([[0, 1], [1, 2], [2, 0]])
+
+
+# ============ Base mesh ============
+
+def _codes(lattice, steps):
+    side = steps + 1
+    return (lattice[:, 0] * side + lattice[:, 1]) * side + lattice[:, 2]
+
+
+def _weld(lattice, faces, steps):
+    """Merge coincident lattice vertices and drop the unused ones."""
+    codes, inverse = np.unique(_codes(lattice, steps), return_inverse=True)
+    merged = np.empty((codes.size, 3), dtype=lattice.dtype)
+    merged[inverse] = lattice
+    return merged, inverse.reshape(-1)[faces]
+
+
+def cube_surface(level, steps):
+    """Uniform triangulation of the six faces with 2^level quads per side.
+
+    Returns integer lattice coordinates in [0, steps] and outward-wound
+    (T, 3) faces.
+    """
+    n = 1 << level
+    ticks = np.arange(n + 1) * (steps // n)
+    u, v = np.meshgrid(ticks, ticks, indexing="ij")
+    i, j = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    corner = (i * (n + 1) + j).ravel()
+    quads = np.stack([corner, corner + n + 1, corner + n + 2, corner + 1], axis=1)
+    grid_faces = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+
+    lattice, faces = [], []
+    for axis in range(3):
+        others = [a for a in range(3) if a != axis]
+        for side in (0, steps):
+            points = np.empty((u.size, 3), dtype=np.int64)
+            points[:, axis] = side
+            points[:, others[0]] = u.ravel()
+            points[:, others[1]] = v.ravel()
+            tris = grid_faces
+            # (u, v, axis) is right-handed only for axis 1; flip to face outward
+            outward = (side == steps) == (axis != 1)
+            if not outward:
+                tris = tris[:, ::-1]
+            faces.append(tris + sum(len(p) for p in lattice))
+            lattice.append(points)
+    return _weld(np.concatenate(lattice), np.concatenate(faces), steps)
+
+
+# ============ Refinement ============
+
+def _edges(faces):
+    """Unique undirected edges and the edge id of every triangle side."""
+    sides = np.sort(faces[:, _EDGES], axis=2).reshape(-1, 2)
+    edges, inverse = np.unique(sides, axis=0, return_inverse=True)
+    return edges, inverse.reshape(faces.shape[0], 3)
+
+
+def _split(faces, side_edges, marked, midpoint):
+    """Split every face along its marked sides."""
+    count = marked[side_edges].sum(axis=1)
+    keep = faces[count == 0]
+
+    full = count == 3
+    a, b, c = faces[full].T
+    mab, mbc, mca = midpoint[side_edges[full]].T
+    quads = np.stack([
+        np.stack([a, mab, mca], axis=1),
+        np.stack([mab, b, mbc], axis=1),
+        np.stack([mca, mbc, c], axis=1),
+        np.stack([mab, mbc, mca], axis=1),
+    ], axis=1).reshape(-1, 3)
+
+    # Rotate partially split faces so their first marked side is (0, 1)
+    # and, for two marked sides, the second is (1, 2)
+    partial = np.flatnonzero((count == 1) | (count == 2))
+    flags = marked[side_edges[partial]]
+    shift = np.where(flags.sum(axis=1) == 1, flags.argmax(axis=1),
+                     np.where(flags[:, 2], np.where(flags[:, 0], 2, 1), 0))
+    order = (shift[:, None] + np.arange(3)) % 3
+    a, b, c = np.take_along_axis(faces[partial], order, axis=1).T
+    mab, mbc, _ = midpoint[np.take_along_axis(side_edges[partial], order, axis=1)].T
+    two = count[partial] == 2
+
+    halves = np.stack([a, mab, c, mab, b, c], axis=1)[~two].reshape(-1, 3)
+    thirds = np.stack([a, mab, mbc, mab, b, mbc, a, mbc, c], axis=1)[two].reshape(-1, 3)
+
+    return np.concatenate([keep, quads, halves, thirds])
+
+
+def gamut_mesh(space, tolerance=TOLERANCE, min_level=MIN_LEVEL, max_level=MAX_LEVEL):
+    """Adaptively refined cube boundary for ``space``.
+
+    Returns sRGB vertex colors (V, 3) float32, display ``positions``
+    (V, 3) float32 and outward-wound ``faces`` (T, 3) uint32.
+    """
+    steps = 1 << max_level
+    lattice, faces = cube_surface(min(min_level, max_level), steps)
+    positions = transform_rgb_to_space_batch(lattice / steps, space)
+
+    while True:
+        edges, side_edges = _edges(faces)
+        a, b = lattice[edges[:, 0]], lattice[edges[:, 1]]
+        splittable = np.all((a + b) % 2 == 0, axis=1)
+        mid = (a + b) // 2
+        mapped = transform_rgb_to_space_batch(mid / steps, space)
+        chord = (positions[edges[:, 0]] + positions[edges[:, 1]]) / 2
+        marked = splittable & (np.linalg.norm(mapped - chord, axis=1) > tolerance)
+        if not marked.any():
+            break
+
+        # Faces with two marked sides are split on all three where possible,
+        # which keeps triangles closer to their parents' shape
+        while True:
+            sides = marked[side_edges]
+            twos = (sides.sum(axis=1) == 2) & splittable[side_edges].all(axis=1)
+            if not twos.any():
+                break
+            marked[side_edges[twos].ravel()] = True
+
+        new = np.flatnonzero(marked)
+        midpoint = np.full(edges.shape[0], -1)
+        midpoint[new] = lattice.shape[0] + np.arange(new.size)
+        lattice = np.concatenate([lattice, mid[new]])
+        positions = np.concatenate([positions, mapped[new]])
+        faces = _split(faces, side_edges, marked, midpoint)
+
+    rgb = (lattice / steps).astype(np.float32)
+    return rgb, positions.astype(np.float32), faces.astype(np.uint32)
+
+
+def uniform_mesh(space, level):
+    """Uniform cube boundary with 2^level quads per face side, for comparison."""
+    steps = 1 << level
+    lattice, faces = cube_surface(level, steps)
+    rgb = lattice / steps
+    positions = transform_rgb_to_space_batch(rgb, space)
+    return rgb.astype(np.float32), positions.astype(np.float32), faces.astype(np.uint32)
+
+
+def mesh_error(rgb, positions, faces, space, samples_per_face=16, seed=0):
+    """Max / mean distance between the flat triangles and the true surface.
+
+    Random barycentric points of every face are mapped exactly and compared
+    with the linear interpolation of the face's vertex positions. HSV and
+    HSL are discontinuous at black (and HSL at white), where no mesh gets
+    close, so ``p99`` is the more useful figure for them.
+    """
+    rng = np.random.default_rng(seed)
+    weights = rng.dirichlet(np.ones(3), size=(faces.shape[0], samples_per_face))
+    corners_rgb = rgb[faces].astype(np.float64)
+    corners_pos = positions[faces].astype(np.float64)
+    exact = transform_rgb_to_space_batch(np.einsum("tsk,tkc->tsc", weights, corners_rgb), space)
+    flat = np.einsum("tsk,tkc->tsc", weights, corners_pos)
+    err = np.linalg.norm(exact - flat, axis=-1)
+    return {"max": float(err.max()), "p99": float(np.percentile(err, 99)), "mean": float(err.mean())}
+
+
+# ============ Export ============
+
+def save_mesh(path, rgb, positions, faces):
+    """``.npz`` with the three arrays, or Wavefront ``.obj`` with vertex colors."""
+    if path.endswith(".obj"):
+        with open(path, "w") as f:
+            np.savetxt(f, np.hstack([positions, rgb]), fmt="v %.6f %.6f %.6f %.4f %.4f %.4f")
+            np.savetxt(f, faces + 1, fmt="f %d %d %d")
+    else:
+        np.savez_compressed(path, rgb=rgb, positions=positions, faces=faces)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build adaptive gamut-boundary meshes of the sRGB cube.")
+    parser.add_argument("--spaces", nargs="+", default=list(SPACES))
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="max chord error in display units")
+    parser.add_argument("--min-level", type=int, default=MIN_LEVEL)
+    parser.add_argument("--max-level", type=int, default=MAX_LEVEL)
+    parser.add_argument("--format", choices=("npz", "obj"), default="npz")
+    parser.add_argument("--dir", help="write one mesh per space to this directory")
+    args = parser.parse_args()
+
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+    for space in args.spaces:
+        mesh = gamut_mesh(space, args.tolerance, args.min_level, args.max_level)
+        err = mesh_error(*mesh, space)
+        # Smallest uniform mesh at least as accurate, for comparison
+        level = args.min_level
+        while level < args.max_level and mesh_error(*uniform_mesh(space, level), space)["p99"] > err["p99"]:
+            level += 1
+        uniform_vertices = 6 * (1 << level) ** 2 + 2
+        print(f"{space:>10}  {len(mesh[0]):6d} vertices  {len(mesh[2]):6d} faces"
+              f"  err max {err['max']:.2e} p99 {err['p99']:.2e}"
+              f"  (uniform 2^{level}: {uniform_vertices} vertices)")
+        if args.dir:
+            slug = space.lower().replace(" ", "_")
+            save_mesh(os.path.join(args.dir, f"{slug}_gamut.{args.format}"), *mesh)
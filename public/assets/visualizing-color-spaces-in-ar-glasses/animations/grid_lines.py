@@ -0,0 +1,38 @@
+"""Grid lines as one multi-subpath mobject per family.
+
+``Transform`` on a VGroup of 243 line VMobjects aligns and interpolates 243
+submobjects every frame. GridLines stores all polylines of a family (the
+R, G or B lines, say) as subpaths of a single VMobject with that family's
+stroke color, so a grid is a handful of point arrays, and transforming
+between two grids of the same layout interpolates one array per family:
+
+    grid = GridLines(axis_polylines(positions), (RED, GREEN, BLUE), stroke_width=1, stroke_opacity=0.3)
+    self.play(Transform(grid, GridLines(axis_polylines(new_positions), (RED, GREEN, BLUE))))
+
+The curves of all lines are computed in one batch (bezier_batch), and
+``set_polylines`` rebuilds them in place, e.g. from an updater that keeps
+straight grid lines attached to moving points.
+"""
+from manim import VGroup, VMobject
+
+from bezier_batch import corner_cubic_beziers, smooth_cubic_beziers
+
+
+class GridLines(VGroup):
+    """One VMobject per family of (M, K, 3) polylines, each line a subpath."""
+
+    def __init__(self, families, colors, smooth=True, stroke_width=1, stroke_opacity=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.smooth = smooth
+        for color in colors:
+            family = VMobject()
+            family.set_stroke(color, width=stroke_width, opacity=stroke_opacity)
+            self.add(family)
+        self.set_polylines(families)
+
+    def set_polylines(self, families):
+        """Replace the lines of every family; same order as ``colors``."""
+        beziers = smooth_cubic_beziers if self.smooth else corner_cubic_beziers
+        for family, polylines in zip(self.submobjects, families):
+            family.set_points(beziers(polylines).reshape(-1, 3))
+        return self
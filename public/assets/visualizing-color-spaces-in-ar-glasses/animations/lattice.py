@@ -0,0 +1,42 @@
+"""RGB lattices and their grid polylines, taken as array slices.
+
+A grid line is a run of lattice points along one RGB axis, so once the
+whole lattice is transformed (one batched call, or one TransformGraph
+lookup), every line of every family is a slice of the result:
+
+    graph = TransformGraph.default()
+    lattice = rgb_lattice(8)                                  # (9, 9, 9, 3)
+    r_lines, g_lines, b_lines = axis_polylines(graph.evaluate(lattice, "CIELAB"))
+    r_lines.shape                                             # (81, 9, 3)
+
+Line order matches the nested loops the scenes used: for the R family the
+G index is outer and the B index inner, and so on.
+"""
+import numpy as np
+
+
+def rgb_lattice(res, blue=None):
+    """sRGB lattice with ``res`` steps per axis, (res+1, res+1, res+1, 3).
+
+    With ``blue`` set, the 2D slice at that blue value, (res+1, res+1, 3).
+    """
+    axis = np.linspace(0.0, 1.0, res + 1)
+    if blue is None:
+        return np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+    r, g = np.meshgrid(axis, axis, indexing="ij")
+    return np.stack([r, g, np.full_like(r, blue)], axis=-1)
+
+
+def axis_polylines(positions):
+    """One (M, K, 3) family of polylines per lattice axis.
+
+    ``positions`` is a transformed lattice (K0, K1, ..., 3); family ``a``
+    holds the lines running along axis ``a``, with the other axes flattened
+    in order.
+    """
+    positions = np.asarray(positions)
+    families = []
+    for axis in range(positions.ndim - 1):
+        along = np.moveaxis(positions, axis, -2)
+        families.append(along.reshape(-1, positions.shape[axis], positions.shape[-1]))
+    return tuple(families)
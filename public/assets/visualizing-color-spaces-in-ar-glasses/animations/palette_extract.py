@@ -0,0 +1,213 @@
+"""Streaming dominant-color extraction with mini-batch k-means in CIELAB.
+
+Images (or whole folders of frames) are read as bands of rows through the
+memory maps of convert_image and converted with rgb_to_lab_batch, so memory
+depends on the band size and k, never on the number of pixels:
+
+    1. a reservoir sample of the stream seeds the centers with k-means++
+    2. mini-batch k-means draws a random batch from every band
+    3. a final pass assigns every pixel and keeps only per-cluster sums
+
+    python palette_extract.py ../captures -k 8 --json palette.json
+
+Results are deterministic for a given ``--seed``; folders are read in sorted
+order. As in convert_image, only ``.npy`` and raw inputs are mapped; other
+formats are decoded whole by Pillow, one file at a time.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from color_kernels import rgb_to_lab_batch
+from convert_image import DEFAULT_ROWS, FULL_SCALE, open_input
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp", ".npy")
+
+# Pixels kept for k-means++ seeding
+SAMPLE_SIZE = 1 << 16
+
+# Pixels drawn from every band for one mini-batch update
+BATCH_SIZE = 4096
+
+# Mini-batch passes over the stream before the final assignment pass
+EPOCHS = 2
+
+# Pixels assigned per block, bounds the (block, k) distance matrix
+CHUNK = 1 << 16
+
+
+# ============ Streaming ============
+
+def image_paths(inputs):
+    """Image files of ``inputs``, expanding directories in sorted order."""
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+            paths.extend(os.path.join(path, name) for name in names)
+        else:
+            paths.append(path)
+    if not paths:
+        raise ValueError(f"no images found in {inputs!r}")
+    return paths
+
+
+def iter_bands(paths, rows=DEFAULT_ROWS):
+    """(N, 3) pixel bands of every image, in their stored dtype."""
+    for path in paths:
+        image = open_input(path)
+        for top in range(0, image.shape[0], rows):
+            yield image[top:top + rows, :, :3].reshape(-1, 3)
+
+
+def to_rgb(pixels):
+    """(N, 3) uint8/uint16/float sRGB -> float32 in [0, 1]."""
+    rgb = pixels.astype(np.float32)
+    scale = FULL_SCALE.get(pixels.dtype)
+    if scale is not None:
+        rgb /= scale
+    return rgb
+
+
+def to_lab(pixels):
+    """(N, 3) uint8/uint16/float sRGB -> float32 Lab."""
+    rgb = to_rgb(pixels)
+    return rgb_to_lab_batch(rgb, out=rgb)
+
+
+# ============ k-means ============
+
+def reservoir_sample(bands, size, rng):
+    """Uniform sample of ``size`` pixels (float sRGB) from a stream of bands.
+
+    Every pixel gets a random key and the ``size`` smallest keys are kept,
+    which is a uniform sample whatever the stream length.
+    """
+    sample = np.empty((0, 3), dtype=np.float32)
+    keys = np.empty(0)
+    for band in bands:
+        band_keys = rng.random(band.shape[0])
+        if keys.size == size:
+            # Only pixels beating the current worst key can enter
+            take = band_keys < keys.max()
+            band, band_keys = band[take], band_keys[take]
+        sample = np.concatenate([sample, to_rgb(band)])
+        keys = np.concatenate([keys, band_keys])
+        if keys.size > size:
+            keep = np.argpartition(keys, size - 1)[:size]
+            sample, keys = sample[keep], keys[keep]
+    return sample
+
+
+def assign(lab, centers):
+    """Nearest center of every row of ``lab`` and the squared distance to it."""
+    dist = (lab * lab).sum(axis=1)[:, None] - 2 * lab @ centers.T + (centers * centers).sum(axis=1)
+    nearest = dist.argmin(axis=1)
+    return nearest, np.maximum(dist[np.arange(lab.shape[0]), nearest], 0)
+
+
+def kmeans_pp(lab, k, rng):
+    """k-means++ seeding: each new center drawn with probability ~ D^2."""
+    centers = np.empty((k, 3), dtype=lab.dtype)
+    centers[0] = lab[rng.integers(lab.shape[0])]
+    closest = ((lab - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = closest.sum()
+        if total > 0:
+            pick = np.searchsorted(np.cumsum(closest), rng.random() * total)
+            pick = min(pick, lab.shape[0] - 1)
+        else:
+            pick = rng.integers(lab.shape[0])
+        centers[i] = lab[pick]
+        np.minimum(closest, ((lab - centers[i]) ** 2).sum(axis=1), out=closest)
+    return centers
+
+
+def minibatch_update(centers, counts, lab):
+    """One mini-batch step: each center moves to the running mean of its points."""
+    nearest, _ = assign(lab, centers)
+    hits = np.bincount(nearest, minlength=centers.shape[0])
+    sums = np.stack([np.bincount(nearest, lab[:, c], centers.shape[0]) for c in range(3)], axis=1)
+    seen = hits > 0
+    counts[seen] += hits[seen]
+    centers[seen] += (sums[seen] - hits[seen, None] * centers[seen]) / counts[seen, None]
+
+
+def cluster_sums(bands, centers):
+    """Per-cluster pixel counts and Lab / sRGB sums over the whole stream."""
+    k = centers.shape[0]
+    counts = np.zeros(k, dtype=np.int64)
+    lab_sums = np.zeros((k, 3))
+    rgb_sums = np.zeros((k, 3))
+    for band in bands:
+        for start in range(0, band.shape[0], CHUNK):
+            rgb = to_rgb(band[start:start + CHUNK])
+            lab = rgb_to_lab_batch(rgb)
+            nearest, _ = assign(lab, centers)
+            counts += np.bincount(nearest, minlength=k)
+            for c in range(3):
+                lab_sums[:, c] += np.bincount(nearest, lab[:, c], k)
+                rgb_sums[:, c] += np.bincount(nearest, rgb[:, c], k)
+    return counts, lab_sums, rgb_sums
+
+
+def extract_palette(inputs, k=8, seed=0, rows=DEFAULT_ROWS, sample=SAMPLE_SIZE,
+                    batch=BATCH_SIZE, epochs=EPOCHS):
+    """Dominant colors of the images in ``inputs`` (files or directories).
+
+    Returns a dict with ``lab`` centers, mean ``rgb`` in [0, 1] and pixel
+    ``weight`` per color, sorted by weight, largest first.
+    """
+    paths = image_paths(inputs)
+    rng = np.random.default_rng(seed)
+
+    seed_lab = rgb_to_lab_batch(reservoir_sample(iter_bands(paths, rows), sample, rng))
+    k = min(k, seed_lab.shape[0])
+    centers = kmeans_pp(seed_lab, k, rng).astype(np.float64)
+
+    counts = np.zeros(k)
+    for _ in range(epochs):
+        for band in iter_bands(paths, rows):
+            picks = rng.integers(band.shape[0], size=min(batch, band.shape[0]))
+            minibatch_update(centers, counts, to_lab(band[picks]))
+
+    # Final assignment; empty clusters keep their mini-batch center
+    totals, lab_sums, rgb_sums = cluster_sums(iter_bands(paths, rows), centers.astype(np.float32))
+    filled = totals > 0
+    centers[filled] = lab_sums[filled] / totals[filled, None]
+    rgb = np.zeros((k, 3))
+    rgb[filled] = rgb_sums[filled] / totals[filled, None]
+
+    order = np.argsort(-totals, kind="stable")
+    return {
+        "lab": centers[order],
+        "rgb": rgb[order],
+        "weight": totals[order] / max(totals.sum(), 1),
+    }
+
+
+def to_hex(rgb):
+    r, g, b = np.clip(np.rint(np.asarray(rgb) * 255), 0, 255).astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract a dominant-color palette in Lab with mini-batch k-means.")
+    parser.add_argument("inputs", nargs="+", help="image files or directories of frames")
+    parser.add_argument("-k", type=int, default=8, help="number of colors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows per band")
+    parser.add_argument("--sample", type=int, default=SAMPLE_SIZE, help="pixels used for k-means++ seeding")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="pixels per band and mini-batch step")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--json", help="write the palette to this file")
+    args = parser.parse_args()
+
+    palette = extract_palette(args.inputs, args.k, args.seed, args.rows, args.sample, args.batch, args.epochs)
+    for lab, rgb, weight in zip(palette["lab"], palette["rgb"], palette["weight"]):
+        print(f"{to_hex(rgb)}  {weight:6.1%}  L*={lab[0]:6.2f} a*={lab[1]:7.2f} b*={lab[2]:7.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({key: value.tolist() for key, value in palette.items()}, f, indent=2)
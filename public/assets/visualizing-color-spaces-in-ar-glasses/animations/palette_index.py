@@ -0,0 +1,326 @@
+"""Nearest-palette-color index in CIELAB.
+
+A PaletteIndex buckets the palette's Lab coordinates (from rgb_to_lab_batch)
+into a uniform grid of about one entry per occupied cell. Queries are grouped
+by home cell and compared against the 3x3x3 block of cells around it, one
+dense distance matrix per cell. A query is settled once its k-th best is
+closer than any unsearched cell; the few that are not widen ring by ring,
+and those outside the grid or still unsettled after MAX_RING rings scan the
+whole palette. Results are exact CIE76 nearest neighbours.
+
+For a 4000-color random palette and 1e5 in-gamut queries this takes about
+0.25 s against 2.7 s for a blocked brute-force scan, and snap_image on a
+1 MP random uint8 image about 1.1 s. Queries far outside the palette's gamut
+mostly end in the full scan and can cost up to about 1.4x brute force.
+
+    index = palette_index(palette_rgb)      # cached per palette content
+    snapped, idx = snap_image(image, palette_rgb)
+
+uint8 images are reduced to their unique colors before querying.
+"""
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from color_kernels import rgb_to_lab_batch
+from color_table import codes_to_rgb, rgb8_to_codes
+
+# Target palette entries per occupied grid cell; smaller cells mean fewer
+# candidates in a query's 3x3x3 block but more queries needing wider rings
+POINTS_PER_CELL = 1
+
+# Upper bound on grid resolution, keeps the cell tables small
+MAX_CELLS_PER_AXIS = 128
+
+# Queries searched together, bounds the candidate arrays of one ring
+QUERY_BLOCK = 1 << 15
+
+# Rings searched beyond the 3x3x3 block before falling back to a full scan
+MAX_RING = 3
+
+# Query-palette distances computed at once by a full scan
+SCAN_BLOCK = 1 << 18
+
+# Palettes whose index is kept by palette_index
+CACHE_SIZE = 8
+
+_ring_cache = {}
+
+
+def _ring(r):
+    """Cell offsets at Chebyshev distance exactly ``r``."""
+    if r not in _ring_cache:
+        side = np.arange(-r, r + 1)
+        offsets = np.stack(np.meshgrid(side, side, side, indexing="ij"), axis=-1).reshape(-1, 3)
+        _ring_cache[r] = offsets[np.abs(offsets).max(axis=1) == r]
+    return _ring_cache[r]
+
+
+# Offsets of a cell's 3x3x3 block, searched first for every query
+_BLOCK = np.concatenate([_ring(0), _ring(1)])
+
+
+def _group_smallest(groups, dist, index, m, k):
+    """k smallest ``dist`` per group, for ``groups`` sorted ascending.
+
+    Returns (m, k) distances and indices, padded with inf for groups that
+    have fewer than k candidates. Uses k segmented min-reductions instead
+    of sorting the candidates.
+    """
+    out_d = np.full((m, k), np.inf)
+    out_i = np.zeros((m, k), dtype=np.intp)
+    if groups.size == 0:
+        return out_d, out_i
+    dist = dist.copy()
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, groups.size])
+    ids = groups[starts]
+    for j in range(k):
+        smallest = np.minimum.reduceat(dist, starts)
+        hits = np.flatnonzero(dist == np.repeat(smallest, sizes))
+        first = hits[np.r_[True, groups[hits][1:] != groups[hits][:-1]]]
+        out_d[ids, j] = dist[first]
+        out_i[ids, j] = index[first]
+        dist[first] = np.inf
+    return out_d, out_i
+
+
+class PaletteIndex:
+    """Uniform-grid k-nearest-neighbour index over palette colors in Lab."""
+
+    def __init__(self, palette_rgb, points_per_cell=POINTS_PER_CELL):
+        self.palette_rgb = np.asarray(palette_rgb, dtype=np.float64).reshape(-1, 3)
+        if self.palette_rgb.shape[0] == 0:
+            raise ValueError("palette is empty")
+        lab = rgb_to_lab_batch(self.palette_rgb)
+        self.palette_lab = lab
+
+        self.low = lab.min(axis=0)
+        extent = lab.max(axis=0) - self.low
+        side = max(1, round((lab.shape[0] / points_per_cell) ** (1 / 3)))
+        self._set_cell(max(extent.max() / side, 1e-9), extent)
+        # Colors fill only part of their Lab bounding box; rescale the cells
+        # so the occupied ones hold about points_per_cell entries each
+        occupied = np.unique(np.ravel_multi_index(self._cells(lab).T, self.dims)).size
+        scale = (points_per_cell * occupied / lab.shape[0]) ** (1 / 3)
+        self._set_cell(self.cell * scale, extent)
+
+        cell_ids = np.ravel_multi_index(self._cells(lab).T, self.dims)
+        self._order = np.argsort(cell_ids, kind="stable")
+        self._lab = lab[self._order]
+        self._lab_t = np.ascontiguousarray(self._lab.T)
+        sorted_ids = cell_ids[self._order]
+        all_ids = np.arange(np.prod(self.dims))
+        self._starts = np.searchsorted(sorted_ids, all_ids)
+        self._counts = np.searchsorted(sorted_ids, all_ids, side="right") - self._starts
+
+    def __len__(self):
+        return self.palette_rgb.shape[0]
+
+    def _set_cell(self, cell, extent):
+        self.cell = max(cell, extent.max() / MAX_CELLS_PER_AXIS, 1e-9)
+        self.dims = np.floor(extent / self.cell).astype(np.intp) + 1
+
+    def _cells(self, lab):
+        cells = np.floor((lab - self.low) / self.cell).astype(np.intp)
+        return np.clip(cells, 0, self.dims - 1)
+
+    def _clearance(self, lab, home, r):
+        """Distance from each query to the nearest face of its searched block."""
+        lower = self.low + (home - r) * self.cell
+        upper = self.low + (home + r + 1) * self.cell
+        below = np.where(home - r > 0, lab - lower, np.inf)
+        above = np.where(home + r < self.dims - 1, upper - lab, np.inf)
+        return np.minimum(below, above).min(axis=1)
+
+    def _block_candidates(self, cell_ids):
+        """Palette positions in the 3x3x3 block of cells around each cell.
+
+        Returns the positions (into the cell-sorted palette) of all cells
+        concatenated, and the (len(cell_ids) + 1,) offsets of each cell's run.
+        """
+        home = np.stack(np.unravel_index(cell_ids, self.dims), axis=-1)
+        cells = home[:, None, :] + _BLOCK[None, :, :]
+        inside = np.all((cells >= 0) & (cells < self.dims), axis=-1)
+        c, s = np.nonzero(inside)
+        ids = np.ravel_multi_index(cells[c, s].T, self.dims)
+        counts = self._counts[ids]
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.repeat(self._starts[ids], counts) + np.arange(counts.sum()) - first
+        per_cell = np.bincount(c, weights=counts, minlength=cell_ids.size).astype(np.intp)
+        return positions, np.r_[0, np.cumsum(per_cell)]
+
+    def _nearest(self, lab, positions, k):
+        """k nearest of the palette ``positions`` for every row of ``lab``.
+
+        Compares each query against each candidate directly, one channel at
+        a time; returns (m, min(k, len(positions))) distances and positions,
+        nearest first.
+        """
+        candidates = self._lab_t[:, positions]
+        dist = np.zeros((lab.shape[0], positions.size))
+        for c in range(3):
+            diff = np.subtract.outer(lab[:, c], candidates[c])
+            diff *= diff
+            dist += diff
+        rows = np.arange(lab.shape[0])[:, None]
+        if k == 1:
+            near = dist.argmin(axis=1)[:, None]
+        else:
+            if k < positions.size:
+                near = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            else:
+                near = np.broadcast_to(np.arange(positions.size), dist.shape)
+            near = np.take_along_axis(near, np.argsort(dist[rows, near], axis=1, kind="stable"), axis=1)
+        return np.sqrt(dist[rows, near]), positions[near]
+
+    def _search_blocks(self, lab, k):
+        """k nearest palette positions within each query's 3x3x3 block.
+
+        Queries sharing a home cell share the block's candidates, so each
+        occupied home cell costs one dense distance matrix. Returns the
+        distances, positions and home cells; queries with fewer than k
+        candidates keep inf distances.
+        """
+        n = lab.shape[0]
+        best_d = np.full((n, k), np.inf)
+        best_i = np.zeros((n, k), dtype=np.intp)
+        home = self._cells(lab)
+        home_ids = np.ravel_multi_index(home.T, self.dims)
+        order = np.argsort(home_ids, kind="stable")
+        cell_ids, first = np.unique(home_ids[order], return_index=True)
+        query_bounds = np.r_[first, n]
+        positions, cand_bounds = self._block_candidates(cell_ids)
+
+        for c in range(cell_ids.size):
+            p = positions[cand_bounds[c]:cand_bounds[c + 1]]
+            if p.size == 0:
+                continue
+            q = order[query_bounds[c]:query_bounds[c + 1]]
+            dist, near = self._nearest(lab[q], p, k)
+            best_d[q, :dist.shape[1]] = dist
+            best_i[q, :dist.shape[1]] = near
+        return best_d, best_i, home
+
+    def _search_rings(self, lab, home, best_d, best_i):
+        """Widen the search from the 3x3x3 block by rings of cells.
+
+        Updates ``best_d``/``best_i`` in place and returns the queries still
+        unsettled after MAX_RING rings.
+        """
+        k = best_d.shape[1]
+        active = np.arange(lab.shape[0])
+
+        for r in range(2, MAX_RING + 1):
+            cells = home[active][:, None, :] + _ring(r)[None, :, :]
+            inside = np.all((cells >= 0) & (cells < self.dims), axis=-1)
+            q, s = np.nonzero(inside)
+            ids = np.ravel_multi_index(cells[q, s].T, self.dims)
+            counts = self._counts[ids]
+            q, ids, counts = q[counts > 0], ids[counts > 0], counts[counts > 0]
+
+            # One candidate per palette entry in each visited cell
+            total = counts.sum()
+            cand_q = np.repeat(q, counts)
+            first = np.repeat(np.cumsum(counts) - counts, counts)
+            cand_i = np.repeat(self._starts[ids], counts) + np.arange(total) - first
+            cand_d = np.linalg.norm(lab[active[cand_q]] - self._lab[cand_i], axis=1)
+
+            # Merge with the current best k and keep the k smallest per query
+            m = active.shape[0]
+            ring_d, ring_i = _group_smallest(cand_q, cand_d, cand_i, m, k)
+            merged_d = np.concatenate([best_d[active], ring_d], axis=1)
+            merged_i = np.concatenate([best_i[active], ring_i], axis=1)
+            keep = np.argsort(merged_d, axis=1, kind="stable")[:, :k]
+            best_d[active] = np.take_along_axis(merged_d, keep, axis=1)
+            best_i[active] = np.take_along_axis(merged_i, keep, axis=1)
+
+            # Unvisited cells lie outside the searched block; stop once the
+            # k-th best is closer than every block face that has cells beyond it
+            active = active[best_d[active, -1] > self._clearance(lab[active], home[active], r)]
+            if active.size == 0:
+                break
+
+        return active
+
+    def _scan(self, lab, k):
+        """k nearest palette positions by comparing against the whole palette."""
+        dist = np.empty((lab.shape[0], k))
+        idx = np.empty((lab.shape[0], k), dtype=np.intp)
+        everything = np.arange(len(self))
+        step = max(1, SCAN_BLOCK // len(self))
+        for start in range(0, lab.shape[0], step):
+            block = slice(start, start + step)
+            dist[block], idx[block] = self._nearest(lab[block], everything, k)
+        return dist, idx
+
+    def query(self, lab, k=1):
+        """k nearest palette entries of (..., 3) Lab colors.
+
+        Returns ``(distances, indices)`` of shape (..., k), nearest first;
+        distances are CIE76 Delta E.
+        """
+        lab = np.asarray(lab, dtype=np.float64)
+        k = min(k, len(self))
+        flat = lab.reshape(-1, 3)
+        dist, idx, home = self._search_blocks(flat, k)
+
+        # The block settles a query once its k-th best is closer than every
+        # block face with cells beyond it. The rest widen ring by ring, but
+        # queries outside the grid are far from every palette color and rings
+        # rarely settle them, so they and any still unsettled get a full scan
+        unsettled = dist[:, -1] > self._clearance(flat, home, 1)
+        in_grid = np.all((flat >= self.low) & (flat < self.low + self.dims * self.cell), axis=1)
+        rest = np.flatnonzero(unsettled & in_grid)
+        far = [np.flatnonzero(unsettled & ~in_grid)]
+        for start in range(0, rest.size, QUERY_BLOCK):
+            block = rest[start:start + QUERY_BLOCK]
+            block_d, block_i = dist[block], idx[block]
+            far.append(block[self._search_rings(flat[block], home[block], block_d, block_i)])
+            dist[block], idx[block] = block_d, block_i
+        far = np.concatenate(far)
+        dist[far], idx[far] = self._scan(flat[far], k)
+        shape = lab.shape[:-1] + (k,)
+        return dist.reshape(shape), self._order[idx].reshape(shape)
+
+    def query_rgb(self, rgb, k=1):
+        """k nearest palette entries of (..., 3) sRGB colors in [0, 1]."""
+        return self.query(rgb_to_lab_batch(rgb), k)
+
+
+# ============ Cached construction ============
+
+_index_cache = OrderedDict()
+
+
+def palette_index(palette_rgb):
+    """PaletteIndex for ``palette_rgb``, rebuilt only when its content changes."""
+    palette_rgb = np.ascontiguousarray(palette_rgb, dtype=np.float64)
+    key = hashlib.sha1(palette_rgb.tobytes()).hexdigest() + str(palette_rgb.shape)
+    index = _index_cache.get(key)
+    if index is None:
+        index = _index_cache[key] = PaletteIndex(palette_rgb)
+        if len(_index_cache) > CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    else:
+        _index_cache.move_to_end(key)
+    return index
+
+
+def snap_image(image, palette_rgb):
+    """Replace every pixel by its perceptually nearest palette color.
+
+    ``image`` is (..., 3) uint8 or float in [0, 1]. Returns the snapped
+    image (float, [0, 1]) and the palette index of every pixel.
+    """
+    index = palette_index(palette_rgb)
+    image = np.asarray(image)
+    if image.dtype == np.uint8:
+        unique, inverse = np.unique(rgb8_to_codes(image).ravel(), return_inverse=True)
+        _, nearest = index.query_rgb(codes_to_rgb(unique))
+        pixel_idx = nearest[:, 0][inverse].reshape(image.shape[:-1])
+    else:
+        _, nearest = index.query_rgb(image)
+        pixel_idx = nearest[..., 0]
+    return index.palette_rgb[pixel_idx], pixel_idx
@@ -0,0 +1,123 @@
+"""Voxel-binned point clouds of a photo's pixels in every display space.
+
+A megapixel image cannot become millions of dots. Instead every pixel is
+converted in batch (bands of rows, shared stages through TransformGraph) and
+binned into a cubic voxel grid over each space's display coordinates. Only
+occupied voxels survive, each reduced to its pixel count, mean position and
+mean color, so the cloud size depends on ``bins`` and ``max_points``, not on
+the image:
+
+    clouds = voxel_clouds("../DJ-Khaled-mirror.jpg", ["sRGB", "CIELAB"])
+    cloud = clouds["CIELAB"]   # positions (M, 3), rgb (M, 3), counts (M,)
+
+    python photo_cloud.py ../DJ-Khaled-mirror.jpg --bins 24 --npz photo_cloud.npz
+"""
+import argparse
+
+import numpy as np
+
+from color_graph import TransformGraph
+from color_kernels import SPACES, transform_rgb_to_space_batch
+from convert_image import DEFAULT_ROWS
+from lattice import rgb_lattice
+from palette_extract import image_paths, iter_bands, to_rgb
+
+# Voxels along the longest display axis
+BINS = 24
+
+# Occupied voxels kept per space, densest first
+MAX_POINTS = 4000
+
+# Lattice used to find each space's display bounds
+BOUNDS_STEPS = 33
+
+_bounds_cache = {}
+
+
+def display_bounds(space):
+    """(low, high) of ``space``'s display coordinates over the sRGB cube."""
+    if space not in _bounds_cache:
+        cube = rgb_lattice(BOUNDS_STEPS - 1).reshape(-1, 3)
+        positions = transform_rgb_to_space_batch(cube, space)
+        _bounds_cache[space] = positions.min(axis=0), positions.max(axis=0)
+    return _bounds_cache[space]
+
+
+class VoxelGrid:
+    """Running per-voxel count, position sum and color sum for one space."""
+
+    def __init__(self, space, bins=BINS):
+        self.space = space
+        self.low, high = display_bounds(space)
+        extent = np.maximum(high - self.low, 1e-9)
+        self.side = extent.max() / bins
+        self.dims = np.maximum(np.ceil(extent / self.side).astype(np.intp), 1)
+        size = int(np.prod(self.dims))
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.position_sums = np.zeros((size, 3))
+        self.rgb_sums = np.zeros((size, 3))
+
+    def add(self, positions, rgb):
+        cells = np.floor((positions - self.low) / self.side).astype(np.intp)
+        np.clip(cells, 0, self.dims - 1, out=cells)
+        ids = np.ravel_multi_index(cells.T, self.dims)
+        size = self.counts.size
+        self.counts += np.bincount(ids, minlength=size)
+        for c in range(3):
+            self.position_sums[:, c] += np.bincount(ids, positions[:, c], size)
+            self.rgb_sums[:, c] += np.bincount(ids, rgb[:, c], size)
+
+    def cloud(self, max_points=MAX_POINTS):
+        """Occupied voxels, densest first: mean positions, mean rgb, counts."""
+        occupied = np.flatnonzero(self.counts)
+        order = np.argsort(-self.counts[occupied], kind="stable")[:max_points]
+        keep = occupied[order]
+        counts = self.counts[keep]
+        return {
+            "positions": self.position_sums[keep] / counts[:, None],
+            "rgb": self.rgb_sums[keep] / counts[:, None],
+            "counts": counts,
+        }
+
+
+def voxel_clouds(inputs, spaces=SPACES, bins=BINS, max_points=MAX_POINTS, rows=DEFAULT_ROWS):
+    """{space: cloud} for the pixels of ``inputs`` (an image path or a list).
+
+    Each band of rows is converted once per space through a shared
+    TransformGraph, so gamma and the Lab cube root run once per band.
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    grids = {space: VoxelGrid(space, bins) for space in spaces}
+    graph = TransformGraph.default()
+    for band in iter_bands(image_paths(inputs), rows):
+        rgb = to_rgb(band).astype(np.float64)
+        for space, grid in grids.items():
+            grid.add(graph.evaluate(rgb, space), rgb)
+        graph.clear()
+    return {space: grid.cloud(max_points) for space, grid in grids.items()}
+
+
+def point_opacities(counts, lowest=0.25):
+    """Opacities growing with log count, so sparse voxels stay visible."""
+    scale = np.log1p(counts) / np.log1p(counts.max())
+    return lowest + (1 - lowest) * scale
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bin a photo's pixels into voxel point clouds per color space.")
+    parser.add_argument("inputs", nargs="+", help="image files or directories")
+    parser.add_argument("--spaces", nargs="+", default=list(SPACES))
+    parser.add_argument("--bins", type=int, default=BINS)
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS)
+    parser.add_argument("--npz", help="write positions/rgb/counts per space to this file")
+    args = parser.parse_args()
+
+    clouds = voxel_clouds(args.inputs, args.spaces, args.bins, args.max_points)
+    for space, cloud in clouds.items():
+        counts = cloud["counts"]
+        print(f"{space:>10}  {counts.size:5d} voxels  {counts.sum():9d} pixels  densest {counts[0]}")
+    if args.npz:
+        np.savez_compressed(args.npz, **{
+            f"{space}/{key}": value for space, cloud in clouds.items() for key, value in cloud.items()
+        })
@@ -0,0 +1,144 @@
+"""Point-cloud mobject for large colored lattices and pixel clouds.
+
+One ``Dot3D`` per point is a tessellated sphere: every frame shades,
+depth-sorts and interpolates one surface mesh per point. PointCloud keeps
+all points in a single mobject backed by one (N, 3) position array and one
+(N, 4) RGBA array, drawn in one pass as square points ``point_size`` pixels
+wide (sprites under the OpenGL renderer):
+
+    cloud = PointCloud(positions, rgb, point_size=6)
+    self.play(PointCloudMorph(cloud, new_positions), run_time=3, rate_func=smooth)
+
+PointCloudMorph moves every point with one NumPy expression per frame, so
+a transition costs the same for 729 points as for one. A 33^3 lattice
+(35937 points) stays interactive at -ql.
+
+The Cairo renderer copies point colors without alpha blending (and the
+mp4 has no alpha anyway), so opacity is pre-multiplied: a point at
+opacity a is drawn opaque in ``background + a * (color - background)``.
+The unblended colors and per-point opacities stay in ``colors``, so
+``fade``/``set_opacity`` (and with them FadeIn/FadeOut) blend toward the
+background and back.
+"""
+from manim import OUT, Animation, PMobject, color_to_rgb, config, interpolate, path_along_arc, straight_path
+import numpy as np
+
+# Point width in pixels at the default 1080p; scaled with the render quality
+POINT_SIZE = 6
+
+
+def point_rgbas(colors, opacities=1.0):
+    """(N, 4) RGBA from (N, 3) or (N, 4) colors in [0, 1] and per-point opacities."""
+    colors = np.asarray(colors, dtype=np.float64)
+    rgbas = np.empty((colors.shape[0], 4))
+    rgbas[:, :3] = colors[:, :3]
+    rgbas[:, 3] = colors[:, 3] if colors.shape[1] == 4 else 1.0
+    rgbas[:, 3] *= opacities
+    return rgbas
+
+
+def premultiply(colors, opacity, background):
+    """Opaque (N, 4) RGBA showing (N, 4) ``colors`` at ``opacity`` over ``background``."""
+    alphas = colors[:, 3:] * opacity
+    rgbas = np.empty_like(colors)
+    rgbas[:, :3] = background + alphas * (colors[:, :3] - background)
+    rgbas[:, 3] = 1.0
+    return rgbas
+
+
+class PointCloud(PMobject):
+    """Colored points as one mobject: ``points`` (N, 3) and ``rgbas`` (N, 4).
+
+    ``colors`` (N, 4) holds the unblended colors and per-point opacities,
+    ``opacity`` the opacity of the whole cloud; ``rgbas`` is derived from
+    both, pre-multiplied over ``background`` (the scene background by
+    default).
+    """
+
+    def __init__(self, positions, colors, opacities=1.0, point_size=POINT_SIZE, background=None, **kwargs):
+        self.opacity = 1.0
+        self.background = color_to_rgb(config.background_color if background is None else background)
+        super().__init__(stroke_width=point_size, **kwargs)
+        self.add_points(np.asarray(positions, dtype=np.float64))
+        self.set_rgbas(point_rgbas(colors, opacities))
+
+    def reset_points(self):
+        super().reset_points()
+        self.colors = np.zeros((0, 4))
+        return self
+
+    def get_array_attrs(self):
+        return super().get_array_attrs() + ["colors"]
+
+    def set_positions(self, positions):
+        """Move every point at once; ``positions`` is (N, 3)."""
+        self.points[:] = positions
+        return self
+
+    def set_rgbas(self, rgbas):
+        """Set the unblended (N, 4) colors and opacities of every point."""
+        self.colors = np.array(rgbas, dtype=np.float64)
+        self.rgbas = premultiply(self.colors, self.opacity, self.background)
+        return self
+
+    def set_opacity(self, opacity, family=True):
+        self.opacity = opacity
+        self.rgbas = premultiply(self.colors, opacity, self.background)
+        if family:
+            for mob in self.submobjects:
+                mob.set_opacity(opacity, family)
+        return self
+
+    def fade(self, darkness=0.5, family=True):
+        self.set_opacity(self.opacity * (1 - darkness), family=False)
+        return super().fade(darkness, family)
+
+    def interpolate_color(self, mobject1, mobject2, alpha):
+        if isinstance(mobject1, PointCloud) and isinstance(mobject2, PointCloud):
+            self.colors = interpolate(mobject1.colors, mobject2.colors, alpha)
+            self.opacity = interpolate(mobject1.opacity, mobject2.opacity, alpha)
+        return super().interpolate_color(mobject1, mobject2, alpha)
+
+
+class PointCloudMorph(Animation):
+    """Move all points of a PointCloud from their current to ``target`` positions.
+
+    ``path_arc`` bends every path along an arc around ``path_arc_axis``, as
+    in Transform; the part of each move along the axis is interpolated
+    linearly, so points still end on their targets. ``offsets`` (N, 3)
+    bends each path on its own: a point passes ``offset`` away from the
+    midpoint of its straight path.
+    """
+
+    def __init__(self, cloud, target, path_arc=0, path_arc_axis=OUT, offsets=None, **kwargs):
+        self.target = np.asarray(target, dtype=np.float64)
+        if self.target.shape != cloud.points.shape:
+            raise ValueError(f"target shape {self.target.shape} does not match the cloud's {cloud.points.shape}")
+        self.offsets = None if offsets is None else np.asarray(offsets, dtype=np.float64)
+        self.axis = np.asarray(path_arc_axis, dtype=np.float64) / np.linalg.norm(path_arc_axis) if path_arc else None
+        self.path_func = path_along_arc(path_arc, path_arc_axis) if path_arc else straight_path()
+        super().__init__(cloud, **kwargs)
+
+    def begin(self):
+        self.start = self.mobject.points.copy()
+        if self.axis is None:
+            self.axial = None
+        else:
+            # path_along_arc only rotates about the axis; it never covers this part
+            self.axial = np.outer((self.target - self.start) @ self.axis, self.axis)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        t = self.rate_func(alpha)
+        if abs(t - 1) < 1e-9:
+            # Land exactly on the targets whatever the rounding of the path
+            self.mobject.set_positions(self.target)
+            return
+        if self.axial is None:
+            points = self.path_func(self.start, self.target, t)
+        else:
+            points = self.path_func(self.start, self.target - self.axial, t) + t * self.axial
+        if self.offsets is not None:
+            # Quadratic bulge: zero at both ends, the full offset halfway
+            points += (4 * t * (1 - t)) * self.offsets
+        self.mobject.set_positions(points)
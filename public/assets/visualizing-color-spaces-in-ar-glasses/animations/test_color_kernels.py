@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from color_kernels import (
+    CONVERTERS,
+    FLOAT32_MAX_DELTA_E,
+    FLOAT32_MAX_ERROR,
+    SPACES,
+    float32_error,
+    linear_to_xyz,
+    rgb_to_cylindrical_batch,
+    srgb_to_linear,
+    transform_rgb_to_space,
+    xyz_to_lab,
+)
+from lattice import rgb_lattice
+
+# Spaces on a 0-100 scale, bounded by FLOAT32_MAX_DELTA_E
+SCALED_SPACES = ("CIELAB", "CIELAB dE", "CIELUV", "CIE LCh")
+
+
+@pytest.fixture(scope="module")
+def errors():
+    return float32_error()
+
+
+@pytest.mark.parametrize("space", list(CONVERTERS))
+def test_float32_error_within_documented_bound(errors, space):
+    bound = FLOAT32_MAX_DELTA_E if space in SCALED_SPACES else FLOAT32_MAX_ERROR
+    assert errors[space] < bound
+
+
+def test_float32_delta_e_within_documented_bound(errors):
+    assert errors["CIELAB dE"] < FLOAT32_MAX_DELTA_E
+
+
+@pytest.mark.parametrize("space", list(CONVERTERS))
+def test_float32_in_float32_out(space):
+    rgb = rgb_lattice(4).astype(np.float32)
+    assert CONVERTERS[space](rgb).dtype == np.float32
+    out = np.empty_like(rgb)
+    assert CONVERTERS[space](rgb, out) is out
+
+
+@pytest.mark.parametrize("space", list(CONVERTERS))
+def test_float64_stays_float64(space):
+    assert CONVERTERS[space](rgb_lattice(4)).dtype == np.float64
+
+
+def test_component_first_chain_keeps_float32():
+    rgb = rgb_lattice(4).reshape(-1, 3).T.astype(np.float32)
+    linear = srgb_to_linear(rgb)
+    xyz = linear_to_xyz(linear)
+    lab = xyz_to_lab(xyz)
+    assert (linear.dtype, xyz.dtype, lab.dtype) == (np.float32,) * 3
+    expected = xyz_to_lab(linear_to_xyz(srgb_to_linear(rgb.astype(np.float64))))
+    assert np.abs(lab - expected).max() < FLOAT32_MAX_DELTA_E
+
+
+@pytest.mark.parametrize("space", SPACES)
+def test_transform_rgb_to_space_keeps_float32(space):
+    rgb = rgb_lattice(4).reshape(-1, 3).T.astype(np.float32)
+    # The scalar HSV/HSL converters divide by zero on black and grays
+    with np.errstate(divide="ignore", invalid="ignore"):
+        assert transform_rgb_to_space(rgb, space).dtype == np.float32
+
+
+def test_batched_kernels_accept_lists():
+    rgb = [[0.2, 0.5, 0.9], [1.0, 1.0, 1.0], [0.0, 0.0, 0.0]]
+    hsv, hsl = rgb_to_cylindrical_batch(rgb)
+    np.testing.assert_array_equal(hsv, CONVERTERS["HSV"](np.array(rgb)))
+    np.testing.assert_array_equal(hsl, CONVERTERS["HSL"](np.array(rgb)))
+    for space, convert in CONVERTERS.items():
+        np.testing.assert_array_equal(convert(rgb), convert(np.array(rgb)))
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from color_kernels import rgb_to_lab_batch
+from gamut_map import DISPLAYS, display_matrices, in_gamut, map_to_gamut
+from lattice import rgb_lattice
+
+
+def test_display_matrices_are_cached_per_display():
+    display = DISPLAYS["Display P3"]
+    first = display_matrices(**display)
+    again = display_matrices([list(xy) for xy in display["primaries"]], np.array(display["white"]))
+    assert again is first
+
+
+@pytest.mark.parametrize("name", list(DISPLAYS))
+def test_srgb_stays_in_gamut(name):
+    lab = rgb_to_lab_batch(rgb_lattice(16))
+    assert in_gamut(lab, **DISPLAYS[name]).all()
+    mapped, outside = map_to_gamut(lab, **DISPLAYS[name])
+    assert not outside.any()
+
+
+def test_out_of_gamut_keeps_lightness_and_hue():
+    lab = np.array([[50.0, 120.0, 0.0], [70.0, -90.0, 90.0]])
+    mapped, outside = map_to_gamut(lab)
+    assert outside.all()
+    assert in_gamut(mapped).all()
+    np.testing.assert_allclose(mapped[:, 0], lab[:, 0])
+    np.testing.assert_allclose(np.arctan2(mapped[:, 2], mapped[:, 1]), np.arctan2(lab[:, 2], lab[:, 1]))
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from color_kernels import rgb_to_lab_batch
+from palette_index import PaletteIndex, snap_image
+
+
+def brute_force(lab, palette_lab, k):
+    dist = np.linalg.norm(lab[:, None, :] - palette_lab[None, :, :], axis=-1)
+    return np.sort(dist, axis=1)[:, :k]
+
+
+@pytest.mark.parametrize("size", [1, 7, 300])
+@pytest.mark.parametrize("k", [1, 3])
+def test_query_matches_brute_force(size, k):
+    rng = np.random.default_rng(size)
+    index = PaletteIndex(rng.random((size, 3)))
+    # In-gamut colors plus Lab points outside the palette's grid
+    lab = np.concatenate([
+        rgb_to_lab_batch(rng.random((500, 3))),
+        rng.random((200, 3)) * [100, 300, 300] - [0, 150, 150],
+    ])
+    dist, idx = index.query(lab, k)
+    expected = brute_force(lab, index.palette_lab, min(k, size))
+    np.testing.assert_allclose(dist, expected)
+    np.testing.assert_allclose(np.linalg.norm(lab[:, None, :] - index.palette_lab[idx], axis=-1), dist)
+
+
+def test_query_keeps_leading_shape():
+    index = PaletteIndex(np.random.default_rng(0).random((50, 3)))
+    dist, idx = index.query_rgb(np.zeros((4, 5, 3)), k=2)
+    assert dist.shape == idx.shape == (4, 5, 2)
+    assert index.query(np.empty((0, 3)))[1].shape == (0, 1)
+
+
+def test_snap_image_uint8_matches_float():
+    rng = np.random.default_rng(1)
+    palette = rng.random((64, 3))
+    image = rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)
+    snapped, idx = snap_image(image, palette)
+    _, float_idx = snap_image(image / 255.0, palette)
+    np.testing.assert_array_equal(idx, float_idx)
+    np.testing.assert_array_equal(snapped, palette[idx])
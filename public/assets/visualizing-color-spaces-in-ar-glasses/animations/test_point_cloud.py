@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+manim = pytest.importorskip("manim")
+
+from point_cloud import PointCloud, PointCloudMorph  # noqa: E402
+
+COLORS = np.array([[1.0, 0.0, 0.0], [0.2, 0.4, 0.6], [1.0, 1.0, 1.0]])
+
+
+def cloud(opacities=1.0, background="#000000"):
+    return PointCloud(np.zeros((3, 3)), COLORS, opacities, background=background)
+
+
+def test_opacity_is_premultiplied():
+    dots = cloud(np.array([1.0, 0.5, 0.25]))
+    np.testing.assert_allclose(dots.rgbas[:, :3], COLORS * [[1.0], [0.5], [0.25]])
+    np.testing.assert_allclose(dots.rgbas[:, 3], 1.0)
+
+
+def test_fade_blends_toward_background():
+    dots = cloud(background="#ffffff")
+    np.testing.assert_allclose(dots.rgbas[:, :3], COLORS)
+    dots.fade(0.75)
+    np.testing.assert_allclose(dots.rgbas[:, :3], 1 - 0.25 * (1 - COLORS))
+    dots.fade(1)
+    np.testing.assert_allclose(dots.rgbas[:, :3], 1.0)
+
+
+def test_set_opacity_restores_colors():
+    dots = cloud()
+    dots.set_opacity(0)
+    np.testing.assert_allclose(dots.rgbas[:, :3], 0.0)
+    dots.set_opacity(1)
+    np.testing.assert_allclose(dots.rgbas[:, :3], COLORS)
+
+
+def test_fade_in_starts_at_background_and_ends_at_colors():
+    dots = cloud(np.array([1.0, 0.5, 0.25]))
+    final = dots.rgbas.copy()
+    animation = manim.FadeIn(dots)
+    animation.begin()
+    np.testing.assert_allclose(dots.rgbas[:, :3], 0.0)
+    animation.interpolate(1)
+    np.testing.assert_allclose(dots.rgbas, final)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"path_arc": 1.0},
+        {"path_arc": -2.5, "path_arc_axis": np.array([1.0, 1.0, 0.0])},
+        {"offsets": np.full((50, 3), 0.5)},
+        {"path_arc": 1.0, "offsets": np.full((50, 3), 0.5)},
+    ],
+)
+def test_morph_starts_and_ends_on_the_given_positions(kwargs):
+    rng = np.random.default_rng(0)
+    start, target = rng.normal(size=(2, 50, 3))
+    dots = PointCloud(start, np.ones((50, 3)))
+    morph = PointCloudMorph(dots, target, rate_func=lambda t: t, **kwargs)
+    morph.begin()
+    np.testing.assert_allclose(dots.points, start, atol=1e-12)
+    morph.interpolate(0.5)
+    assert np.abs(dots.points - target).max() > 0.1
+    morph.interpolate(1)
+    np.testing.assert_array_equal(dots.points, target)
+
+
+def test_morph_rejects_mismatched_targets():
+    with pytest.raises(ValueError):
+        PointCloudMorph(cloud(), np.zeros((4, 3)))
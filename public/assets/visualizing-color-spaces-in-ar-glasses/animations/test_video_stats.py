@@ -0,0 +1,25 @@
+import numpy as np
+
+from video_stats import L_BINS, FrameStats
+
+# Narrower than sRGB, so out_of_gamut is not trivially 0
+TARGET = {"primaries": ((0.62, 0.34), (0.31, 0.56), (0.16, 0.08)), "white": (0.3127, 0.3290)}
+
+
+def test_l_histogram_counts_every_pixel_including_white():
+    stats = FrameStats(TARGET)
+    for value in (255, 254, 0):
+        stats.add(0, 0.0, np.full((10, 12, 3), value, dtype=np.uint8))
+    table = stats.table()
+    np.testing.assert_array_equal(table["L_hist"].sum(axis=1), 120)
+    assert table["L_hist"][0, L_BINS - 1] == 120
+    assert table["L_hist"][2, 0] == 120
+
+
+def test_out_of_gamut_against_a_narrow_target():
+    stats = FrameStats(TARGET)
+    red = np.zeros((4, 4, 3), dtype=np.uint8)
+    red[..., 0] = 255
+    stats.add(0, 0.0, red)
+    stats.add(1, 0.04, np.full((4, 4, 3), 128, dtype=np.uint8))
+    np.testing.assert_allclose(stats.table()["out_of_gamut"], [1.0, 0.0])
@@ -0,0 +1,210 @@
+"""Streaming per-frame color statistics of a video, read from an ffmpeg pipe.
+
+ffmpeg decodes the video to rgb24 rawvideo on its stdout; frames are read
+straight into one reused buffer, converted with rgb_to_lab_batch into one
+reused float32 scratch array and reduced to a row of statistics. Nothing is
+written to disk but the final table, and memory stays flat however long the
+video is.
+
+Per frame:
+    mean L*, a*, b* and chroma, 95th-percentile chroma
+    fraction of pixels outside the target display gamut (gamut_map)
+    L* histogram (L_BINS) and a*b* histogram (AB_BINS x AB_BINS)
+
+``out_of_gamut`` is the share of a frame's pixels that the target display
+cannot show and would have to gamut-map (lose chroma). Frames are decoded
+as sRGB, so every pixel lies inside sRGB: against a target that contains
+sRGB (all of DISPLAYS) the number is always ~0. It only says something for
+a narrower target, such as the measured primaries of the glasses' display,
+so there is no default target; the caller names one:
+
+    python video_stats.py ../full_demo.mp4 --primaries 0.62 0.34 0.31 0.56 0.16 0.08 --out full_demo_stats.npz
+    python video_stats.py ../rec.mp4 --display "Rec. 709" --width 480 --every 5
+
+Requires ``ffmpeg`` and ``ffprobe`` on the PATH.
+"""
+import argparse
+import json
+import subprocess
+
+import numpy as np
+
+from color_kernels import rgb_to_lab_batch
+from gamut_map import D65_XY, DISPLAYS, in_gamut
+from lattice import rgb_lattice
+
+L_BINS = 16
+AB_BINS = 16
+AB_RANGE = 128.0
+
+COLUMNS = ("frame", "time", "mean_L", "mean_a", "mean_b", "mean_chroma", "p95_chroma", "out_of_gamut")
+
+
+# ============ ffmpeg ============
+
+def probe(path):
+    """(width, height, fps) of the first video stream."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=width,height,avg_frame_rate", "-of", "json", path],
+        capture_output=True, check=True, text=True,
+    )
+    stream = json.loads(result.stdout)["streams"][0]
+    num, den = stream["avg_frame_rate"].split("/")
+    fps = float(num) / float(den) if float(den) else 0.0
+    return stream["width"], stream["height"], fps
+
+
+def iter_frames(path, width=None, every=1):
+    """Yield (index, (H, W, 3) uint8 frame) from ffmpeg, reusing one buffer.
+
+    ``width`` rescales on decode (height keeps the aspect ratio); ``every``
+    keeps one frame in ``every``. The yielded array is overwritten by the
+    next frame, so copy it to keep it. Raises RuntimeError with ffmpeg's
+    messages when decoding fails.
+    """
+    src_width, src_height, _ = probe(path)
+    filters = []
+    if every > 1:
+        filters.append(f"select=not(mod(n\\,{every}))")
+    if width:
+        height = round(src_height * width / src_width / 2) * 2
+        filters.append(f"scale={width}:{height}")
+    else:
+        width, height = src_width, src_height
+
+    command = ["ffmpeg", "-v", "error", "-nostdin", "-i", path]
+    if filters:
+        command += ["-vf", ",".join(filters), "-vsync", "0"]
+    command += ["-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+
+    frame_bytes = width * height * 3
+    buffer = bytearray(frame_bytes)
+    view = memoryview(buffer)
+    frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+    # -v error keeps stderr to a few lines, so it cannot fill its pipe
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=frame_bytes)
+    finished = False
+    try:
+        index = 0
+        while True:
+            filled = 0
+            while filled < frame_bytes:
+                count = proc.stdout.readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+            if filled < frame_bytes:
+                break
+            yield index * every, frame
+            index += 1
+        finished = True
+    finally:
+        proc.stdout.close()
+        if not finished:
+            proc.kill()
+        returncode = proc.wait()
+        errors = proc.stderr.read().decode(errors="replace")
+        proc.stderr.close()
+    if returncode:
+        raise RuntimeError(f"ffmpeg exited with status {returncode} decoding {path!r}: {errors.strip()}")
+
+
+# ============ Statistics ============
+
+class FrameStats:
+    """Per-frame statistics, accumulated row by row into a compact table."""
+
+    def __init__(self, display):
+        self.display = display
+        self.rows = []
+        self.l_hist = []
+        self.ab_hist = []
+        self.scratch = None
+
+    def add(self, index, time, frame):
+        if self.scratch is None or self.scratch.shape != frame.shape:
+            self.scratch = np.empty(frame.shape, dtype=np.float32)
+        lab = self.scratch
+        np.divide(frame, 255, out=lab)
+        rgb_to_lab_batch(lab, out=lab)
+        flat = lab.reshape(-1, 3)
+
+        chroma = np.hypot(flat[:, 1], flat[:, 2])
+        outside = 1 - in_gamut(flat, **self.display).mean()
+        mean = flat.mean(axis=0, dtype=np.float64)
+        self.rows.append((index, time, *mean, chroma.mean(dtype=np.float64),
+                          np.percentile(chroma, 95), outside))
+        # White comes out a hair above L* 100, past the last bin edge
+        np.clip(flat[:, 0], 0, 100, out=flat[:, 0])
+        self.l_hist.append(np.histogram(flat[:, 0], bins=L_BINS, range=(0, 100))[0])
+        self.ab_hist.append(np.histogram2d(
+            flat[:, 1], flat[:, 2], bins=AB_BINS, range=((-AB_RANGE, AB_RANGE), (-AB_RANGE, AB_RANGE)),
+        )[0].astype(np.uint32))
+
+    def table(self):
+        """{column: (F,) array} plus ``L_hist`` (F, L_BINS) and ``ab_hist`` (F, AB_BINS, AB_BINS)."""
+        rows = np.array(self.rows, dtype=np.float64).reshape(-1, len(COLUMNS))
+        table = {name: rows[:, i].astype(np.float32) for i, name in enumerate(COLUMNS)}
+        table["frame"] = rows[:, 0].astype(np.int32)
+        table["L_hist"] = np.array(self.l_hist, dtype=np.uint32).reshape(-1, L_BINS)
+        table["ab_hist"] = np.array(self.ab_hist, dtype=np.uint32).reshape(-1, AB_BINS, AB_BINS)
+        return table
+
+
+def contains_srgb(display):
+    """True when ``display`` can show every sRGB color, so out_of_gamut stays ~0."""
+    # The sRGB cube maps to a parallelepiped; it is inside iff its 8 corners are
+    return bool(in_gamut(rgb_to_lab_batch(rgb_lattice(1)), **display).all())
+
+
+def analyse(path, display, width=None, every=1, log=None):
+    """Per-frame statistics table of the video at ``path``.
+
+    ``display`` is the target gamut as ``{"primaries", "white"}`` (see
+    gamut_map.DISPLAYS); ``out_of_gamut`` is measured against it.
+    """
+    _, _, fps = probe(path)
+    stats = FrameStats(display)
+    for index, frame in iter_frames(path, width, every):
+        stats.add(index, index / fps if fps else 0.0, frame)
+        if log:
+            log(stats.rows[-1])
+    return stats.table()
+
+
+def _print_row(row):
+    frame, time, L, a, b, chroma, p95, outside = row
+    print(f"{frame:6d}  {time:8.2f}s  L* {L:6.2f}  a* {a:7.2f}  b* {b:7.2f}  "
+          f"C* {chroma:6.2f} (p95 {p95:6.2f})  out {outside:6.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame Lab statistics of a video via an ffmpeg pipe.")
+    parser.add_argument("input")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--display", choices=list(DISPLAYS), help="target gamut (all contain sRGB)")
+    target.add_argument("--primaries", type=float, nargs=6, metavar=("RX", "RY", "GX", "GY", "BX", "BY"),
+                        help="custom target primaries, e.g. the measured primaries of the device")
+    parser.add_argument("--white", type=float, nargs=2, metavar=("X", "Y"), help="custom target white point")
+    parser.add_argument("--width", type=int, help="rescale frames to this width while decoding")
+    parser.add_argument("--every", type=int, default=1, help="analyse one frame in N")
+    parser.add_argument("--out", help="write the per-frame table as .npz")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    if args.primaries:
+        display = {"primaries": tuple(zip(args.primaries[::2], args.primaries[1::2])), "white": D65_XY}
+    else:
+        display = dict(DISPLAYS[args.display])
+    if args.white:
+        display["white"] = tuple(args.white)
+    if contains_srgb(display):
+        print("note: the target gamut contains sRGB, so out_of_gamut will stay ~0")
+
+    table = analyse(args.input, display, args.width, args.every, log=None if args.quiet else _print_row)
+    if args.out:
+        np.savez_compressed(args.out, **table)
+    if table["frame"].size:
+        print(f"{table['frame'].size} frames  mean C* {table['mean_chroma'].mean():.2f}  "
+              f"out of gamut {table['out_of_gamut'].mean():.2%}")
@@ -0,0 +1,58 @@
+"""Smooth quadratic Bézier paths for many polylines at once.
+
+``VMobject.set_points_smoothly`` builds a VMobject, lays the points out as
+corners and smooths each subpath in turn. For a family of lines that all
+have K points (streamlines integrated for the same number of steps, the
+longitudinal lines of a tube) the handles of every line come out of one
+vectorised expression instead.
+
+The handles are manimgl's approximate smooth mode ("approx_smooth"), and
+each path is laid out the way a manimgl VMobject stores its points:
+anchors at even indices, one quadratic handle between each pair:
+
+    paths = smooth_quadratic_paths(polylines)   # (M, K, 3) -> (M, 2K-1, 3)
+    for line, path in zip(lines, paths):
+        line.set_points(path)
+"""
+import numpy as np
+
+
+def smooth_quadratic_paths(polylines):
+    """(M, K, 3) polylines -> (M, 2K-1, 3) smooth quadratic paths through every point.
+
+    Each handle averages the two parabolas through the neighbouring
+    anchors; a line whose first and last points coincide is smoothed as a
+    closed loop.
+    """
+    points = np.asarray(polylines, dtype=np.float64)
+    m, k, dim = points.shape
+    paths = np.empty((m, 2 * k - 1, dim))
+    paths[:, 0::2] = points
+    if k < 2:
+        return paths
+    if k == 2:
+        paths[:, 1] = (points[:, 0] + points[:, 1]) / 2
+        return paths
+
+    # Handle between P1 and P2 for a parabola through P0 (left) or P3 (right)
+    to_right = 0.25 * points[:, :-2] + points[:, 1:-1] - 0.25 * points[:, 2:]
+    reverse = points[:, ::-1]
+    to_left = 0.25 * reverse[:, :-2] + reverse[:, 1:-1] - 0.25 * reverse[:, 2:]
+
+    # End handles wrap around on closed lines
+    closed = np.isclose(points[:, 0], points[:, -1]).all(axis=1)[:, None]
+    last_right = np.where(closed, 0.25 * points[:, -2] + points[:, -1] - 0.25 * points[:, 1], to_left[:, 0])
+    first_left = np.where(closed, 0.25 * points[:, 1] + points[:, 0] - 0.25 * points[:, -2], to_right[:, 0])
+
+    handles = paths[:, 1::2]
+    handles[:, :-1] = to_right
+    handles[:, -1] = last_right
+    handles[:, 0] += first_left
+    handles[:, 1:] += to_left[:, ::-1]
+    handles *= 0.5
+
+    # A handle on top of its first anchor would mark a path end; use the midpoint
+    anchors = paths[:, 0:-1:2]
+    false_ends = (handles == anchors).all(axis=-1)
+    handles[false_ends] = 0.5 * (anchors[false_ends] + paths[:, 2::2][false_ends])
+    return paths
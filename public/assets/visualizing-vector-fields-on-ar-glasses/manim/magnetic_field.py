@@ -1,6 +1,8 @@
 from manimlib import *
 import numpy as np
 
+from bezier_batch import smooth_quadratic_paths
+
 class MagneticField(ThreeDScene):
     """Visualizes magnetic field from two dipole magnets"""
 
@@ -301,17 +303,21 @@ class MagneticField(ThreeDScene):
                   "#FF6B9D", "#00CED1", "#FFD700", "#FF69B4",
                   "#32CD32", "#8A2BE2", "#FF4500", "#00FF7F"]
 
-        all_paths = VGroup()
-        for idx, sp in enumerate(start_points):
+        streamlines = []
+        for sp in start_points:
             pos = np.array(sp)
             pts = [pos.copy()]
             for _ in range(35):  # More steps for wider paths
                 v = get_magnetic_field(pos)
                 pos = pos + v * 0.5  # Larger step size
                 pts.append(pos.copy())
+            streamlines.append(pts)
 
+        # Smooth every streamline in one batch
+        all_paths = VGroup()
+        for idx, path_points in enumerate(smooth_quadratic_paths(streamlines)):
             path = VMobject()
-            path.set_points_smoothly(pts)
+            path.set_points(path_points)
             path.set_stroke(color=colors[idx % len(colors)], width=4)
             all_paths.add(path)
 
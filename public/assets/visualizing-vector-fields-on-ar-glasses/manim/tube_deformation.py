@@ -1,6 +1,8 @@
 from manimlib import *
 import numpy as np
 
+from bezier_batch import smooth_quadratic_paths
+
 class TubeDeformation(ThreeDScene):
     def construct(self):
         # Configuration
@@ -166,10 +168,11 @@ class TubeDeformation(ThreeDScene):
             ring_line = Polygon(*ring, stroke_color=wireframe_color, stroke_width=1.5, fill_opacity=0)
             wireframe.add(ring_line)
 
-        for j in range(circle_segments):
-            long_points = [all_rings[i][j] for i in range(len(all_rings))]
+        # Longitudinal lines: the j-th point of every ring, smoothed in one batch
+        long_lines = np.array(all_rings).transpose(1, 0, 2)
+        for long_points in smooth_quadratic_paths(long_lines):
             long_line = VMobject()
-            long_line.set_points_smoothly(long_points)
+            long_line.set_points(long_points)
             long_line.set_stroke(color=wireframe_color, width=1.5)
             wireframe.add(long_line)
 
@@ -1,6 +1,8 @@
 from manimlib import *
 import numpy as np
 
+from bezier_batch import smooth_quadratic_paths
+
 class VectorFieldIntegration(ThreeDScene):
     def construct(self):
         # Colors
@@ -236,17 +238,21 @@ class VectorFieldIntegration(ThreeDScene):
         colors = ["#E63946", "#F4A261", "#2A9D8F", "#4A90A4",
                   "#9B59B6", "#E74C3C", "#1ABC9C", "#3498DB"]
 
-        all_paths = VGroup()
-        for idx, sp in enumerate(start_points):
+        streamlines = []
+        for sp in start_points:
             pos = np.array(sp)
             pts = [pos.copy()]
             for _ in range(20):
                 v = field_contraction(pos)
                 pos = pos + v * step_size
                 pts.append(pos.copy())
+            streamlines.append(pts)
 
+        # Smooth every streamline in one batch
+        all_paths = VGroup()
+        for idx, path_points in enumerate(smooth_quadratic_paths(streamlines)):
             path = VMobject()
-            path.set_points_smoothly(pts)
+            path.set_points(path_points)
             path.set_stroke(color=colors[idx % len(colors)], width=5)
             all_paths.add(path)
 